@@ -16,6 +16,8 @@ from pathlib import Path
 from typing import List, Dict
 from email.message import EmailMessage
 import urllib.request
+from functools import wraps
+from Capstone.metrics.registry import counter, histogram
 
 ALERT_LOG = (Path(__file__).resolve().parents[1] / "alerts.log")
 ALERT_JSON = (Path(__file__).resolve().parents[1] / "alerts.json")
@@ -27,7 +29,27 @@ def app_root() -> Path:
         return Path(sys.executable).resolve().parent
     return Path(__file__).resolve().parents[1]
 
+# ---- Metrics: latency, sent and failure counts per notifier ----
+def instrumented(name):
+    def deco(fn):
+        seconds = histogram("nmas_notifier_seconds", "Notifier call latency", notifier=name)
+        sent = counter("nmas_notifier_alerts_sent_total", "Alerts handed to a notifier", notifier=name)
+        failures = counter("nmas_notifier_failures_total", "Notifier calls that raised", notifier=name)
+        @wraps(fn)
+        def wrapper(alerts, *args, **kwargs):
+            try:
+                with seconds.time():
+                    result = fn(alerts, *args, **kwargs)
+            except Exception:
+                failures.inc()
+                raise
+            sent.inc(len(alerts or ()))
+            return result
+        return wrapper
+    return deco
+
 # ---- Console & file ----
+@instrumented("log")
 def log_alerts(alerts: List[Dict]):
     if not alerts: return 0
     lines = []
@@ -41,6 +63,7 @@ def log_alerts(alerts: List[Dict]):
     return len(lines)
 
 # ---- JSON export (append to an array) ----
+@instrumented("json")
 def export_json(alerts: List[Dict]):
     if not alerts: return
     existing = []
@@ -53,6 +76,7 @@ def export_json(alerts: List[Dict]):
     ALERT_JSON.write_text(json.dumps(existing, indent=2), encoding="utf-8")
 
 # ---- Email (optional) ----
+@instrumented("email")
 def send_email(alerts: List[Dict], *, host="localhost", port=1025,
                sender="noreply@nmas.local", to=("admin@nmas.local",)):
     if not alerts: return 0
@@ -73,6 +97,7 @@ def send_email(alerts: List[Dict], *, host="localhost", port=1025,
     return len(alerts)
 
 # ---- Webhook (optional: Slack/Discord/etc.) ----
+@instrumented("webhook")
 def post_webhook(alerts: List[Dict], url: str):
     if not alerts or not url: return 0
     payload = {
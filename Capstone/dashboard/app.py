@@ -11,10 +11,14 @@
 # permission is prohibited.
 # ---------------------------------------------------------------------------
 
-import sqlite3, base64, json, os, sys
+import sqlite3, base64, json, os, re, sys, threading, time, zlib
+from collections import Counter
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from flask import Flask, request, render_template, make_response, Response, jsonify
+from flask import Flask, request, render_template, make_response, Response, jsonify, g
+from Capstone.metrics.registry import counter, histogram, REGISTRY
+from Capstone.detect.sketches import CountMinSketch, SpaceSaving, HeavyHitters, settings as sketch_settings
+from Capstone.ingest.syslog_listener import ensure_db, INSERT_LOG
 
 def app_root() -> Path:
     # exe dir when frozen, repo root in source
@@ -45,6 +49,8 @@ def load_config():
                 cfg["auth"] = data["auth"]
             if "dashboard" in data and "enable_simulate" in data["dashboard"]:
                 cfg["dashboard"]["enable_simulate"] = data["dashboard"]["enable_simulate"]
+            if "sketches" in data:
+                cfg["sketches"] = data["sketches"]
         except Exception:
             pass
     return cfg
@@ -75,6 +81,22 @@ def get_db():
     ensure_alerts(conn)   # ✅ ensure alerts table exists
     return conn
 
+_LOGS_READY = {}   # db file -> FTS5 search available
+_LOGS_LOCK = threading.Lock()   # ensure_db's column migration is check-then-ALTER
+
+def db_file(conn):
+    return conn.execute("PRAGMA database_list").fetchone()[2]
+
+def logs_ready(conn):
+    """Run ensure_db (logs, indexes, FTS) once per database file; returns
+    whether full-text search is available there."""
+    path = db_file(conn)
+    if path not in _LOGS_READY:
+        with _LOGS_LOCK:
+            if path not in _LOGS_READY:
+                _LOGS_READY[path] = ensure_db(path)
+    return _LOGS_READY[path]
+
 def utcnow():
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
 
@@ -84,6 +106,272 @@ def _ins(conn, ts, src, msg, user=None, port=None):
         (ts, src, msg, user, port)
     )
 
+TOP_SPAN_TTL_SEC = 300   # a wider window than the current request keeps its buckets this long
+
+class TopSources:
+    """Time-bucketed "Top sources" aggregates for one events.db, kept between
+    requests. Each call reads only log rows past the last id it has seen, so a
+    page load costs the new rows plus combining buckets, not a scan.
+
+    Exact mode keeps a Counter per 10 minutes and counts the partial first
+    bucket through the timestamp index; sketch mode keeps a Space-Saving /
+    HeavyHitters pair per hour and counts the whole first hour. Both keep a
+    running total, so a window is either the total minus the buckets before
+    it or the sum of the buckets in it, whichever touches fewer buckets.
+    Buckets older than the widest window requested in the last
+    TOP_SPAN_TTL_SEC are dropped."""
+
+    def __init__(self, sk):
+        self.sk, self.k = sk, int(sk["top_k"])
+        self.exact = not sk["enabled"]
+        # bucket key = ISO timestamp prefix: "YYYY-MM-DDTHH" (hour) or "YYYY-MM-DDTHH:M" (10 min)
+        self.width, self.step = (15, timedelta(minutes=10)) if self.exact else (13, timedelta(hours=1))
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.buckets = {}    # key -> (sources, users)
+        # running sum of all buckets: (Counter, Counter) exact, Count-Min of users with sketches
+        self.total = ((Counter(), Counter()) if self.exact
+                      else CountMinSketch(self.sk["cms_epsilon"], self.sk["cms_delta"]))
+        self.start = None    # earliest bucket loaded
+        self.span, self.span_seen = timedelta(0), 0.0   # widest recent window, when last requested
+        self.last_id = 0
+
+    def _new(self):
+        if self.exact:
+            return Counter(), Counter()
+        return SpaceSaving(self.k), HeavyHitters(self.k, self.sk["cms_epsilon"], self.sk["cms_delta"])
+
+    def _next(self, key):
+        start = datetime.fromisoformat(key + "0000-01-01T00:00:00"[len(key):])
+        return (start + self.step).isoformat()[:self.width]
+
+    def _add(self, rows):
+        for ts, source, username in rows:
+            key = (ts or "")[:self.width]
+            if key not in self.buckets:
+                self.buckets[key] = self._new()
+            sources, users = self.buckets[key]
+            if self.exact:
+                sources[source] += 1
+                self.total[0][source] += 1
+                if username is not None:
+                    users[username] += 1
+                    self.total[1][username] += 1
+            else:
+                sources.add(source)
+                if username is not None:
+                    users.add(username)
+                    self.total.add(username)
+
+    def _drop(self, key):
+        sources, users = self.buckets.pop(key)
+        if self.exact:
+            self.total[0].subtract(sources)
+            self.total[1].subtract(users)
+        else:
+            self.total.subtract(users.cms)
+
+    def _refresh(self, conn, first):
+        top = conn.execute("SELECT MAX(id) FROM logs").fetchone()[0] or 0
+        if top < self.last_id:
+            self.reset()    # logs table was recreated
+        if self.start is not None and top > self.last_id:
+            self._add(r for r in conn.execute(
+                "SELECT timestamp, source, username FROM logs WHERE id > ? AND id <= ?", (self.last_id, top))
+                if (r[0] or "")[:self.width] >= self.start)
+        if self.start is None or first < self.start:
+            # first request, or a wider window than loaded so far: backfill the older buckets once
+            sql = "SELECT timestamp, source, username FROM logs WHERE timestamp >= ? AND id <= ?"
+            args = [first, top]
+            if self.start is not None:
+                sql += " AND timestamp < ?"
+                args.append(self.start)
+            self._add(conn.execute(sql, args))
+            self.start = first
+        self.last_id = top
+        # drop buckets that have slid out of the widest recent window
+        horizon = min(first, (datetime.utcnow() - self.span).isoformat()[:self.width])
+        for key in [k for k in self.buckets if k < horizon]:
+            self._drop(key)
+        self.start = max(self.start, horizon)
+
+    def _window(self, inside, outside, total, empty):
+        """Sum of the `inside` buckets, computed from whichever side is smaller."""
+        if len(outside) < len(inside):
+            acc = total.copy()
+            for b in outside: acc.subtract(b)
+            return acc
+        add = Counter.update if self.exact else CountMinSketch.merge
+        for b in inside: add(empty, b)
+        return empty
+
+    def top(self, conn, since):
+        first = since[:self.width]
+        span, now = datetime.utcnow() - datetime.fromisoformat(since), time.monotonic()
+        with self.lock:
+            if span >= self.span or now - self.span_seen > TOP_SPAN_TTL_SEC:
+                self.span, self.span_seen = span, now
+            self._refresh(conn, first)
+            if not self.exact:
+                inside = [b for k, b in self.buckets.items() if k >= first]
+                outside = [b for k, b in self.buckets.items() if k < first]
+                eps, delta = self.sk["cms_epsilon"], self.sk["cms_delta"]
+                cms = self._window([u.cms for _, u in inside], [u.cms for _, u in outside],
+                                   self.total, CountMinSketch(eps, delta))
+                sources = SpaceSaving(self.k)
+                users = HeavyHitters(self.k, eps, delta, cms=cms)
+                for s, u in inside:
+                    sources.merge(s)
+                    users.candidates.update(u.candidates)
+                return {"approximate": True, "sources": sources.top(self.k), "users": users.top(self.k)}
+            # the first bucket is only partly in the window: counted from the index below
+            inside = [b for k, b in self.buckets.items() if k > first]
+            outside = [b for k, b in self.buckets.items() if k <= first]
+            sources = self._window([s for s, _ in inside], [s for s, _ in outside], self.total[0], Counter())
+            users = self._window([u for _, u in inside], [u for _, u in outside], self.total[1], Counter())
+        for source, username in conn.execute(
+                "SELECT source, username FROM logs WHERE timestamp >= ? AND timestamp < ?",
+                (since, self._next(first))):
+            sources[source] += 1
+            if username is not None: users[username] += 1
+        return {"approximate": False,
+                "sources": [(i, n, 0) for i, n in sources.most_common(self.k) if n > 0],
+                "users": [(i, n, 0) for i, n in users.most_common(self.k) if n > 0]}
+
+_TOP = {}   # (db file, sketch settings) -> TopSources
+_TOP_LOCK = threading.Lock()
+
+def top_sources(conn, since, sk=None):
+    """Top talkers and most-targeted users since `since`, exact or from
+    Space-Saving / Count-Min when sketches are enabled (see TopSources)."""
+    sk = sk or sketch_settings(CONFIG)
+    key = (db_file(conn), tuple(sorted(sk.items())))
+    with _TOP_LOCK:
+        tracker = _TOP.get(key)
+        if tracker is None:
+            tracker = _TOP[key] = TopSources(sk)
+    try:
+        return tracker.top(conn, since)
+    except sqlite3.OperationalError:
+        # logs table not created yet (listener never started)
+        return {"approximate": bool(sk["enabled"]), "sources": [], "users": []}
+
+# -------- Log search ----------
+LOG_PAGE_SIZE = 100
+_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+
+def fts_query(text):
+    """Turn user input into a safe FTS5 MATCH string: "quoted phrases" and bare
+    terms are ANDed; a trailing * on a term makes it a prefix query."""
+    parts = []
+    for phrase, term in _TOKEN.findall(text or ""):
+        word = (phrase or term).strip()
+        prefix = bool(term) and word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            parts.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(parts)
+
+def search_logs(conn, q="", since=None, until=None, source=None, before=None, limit=LOG_PAGE_SIZE):
+    """Newest-first log lines matching q, keyset-paginated on id (< before).
+    Returns (rows, next_before)."""
+    where, params = [], []
+    match = fts_query(q)
+    use_fts = bool(match) and logs_ready(conn)
+    if since: where.append("l.timestamp >= ?"); params.append(since)
+    if until: where.append("l.timestamp <= ?"); params.append(until)
+    if source: where.append("l.source = ?"); params.append(source)
+
+    cols = "l.id, l.timestamp, l.source, IFNULL(l.username,'') AS username, IFNULL(l.port,'') AS port, l.message"
+    if use_fts:
+        sql = f"SELECT {cols} FROM logs_fts f JOIN logs l ON l.id = f.rowid WHERE logs_fts MATCH ?"
+        params.insert(0, match)
+        if before: where.append("f.rowid < ?"); params.append(before)
+        order = "f.rowid DESC"
+    else:
+        sql = f"SELECT {cols} FROM logs l WHERE 1=1"
+        for phrase, term in _TOKEN.findall(q or ""):   # no FTS5: plain substring scan
+            where.append("instr(lower(l.message), lower(?)) > 0"); params.append((phrase or term).rstrip("*"))
+        if before: where.append("l.id < ?"); params.append(before)
+        order = "l.id DESC"
+
+    sql += "".join(f" AND {w}" for w in where) + f" ORDER BY {order} LIMIT ?"
+    params.append(limit + 1)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    except sqlite3.OperationalError:
+        return [], None        # logs table not created yet
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return rows, (rows[-1]["id"] if has_more else None)
+
+def _log_search_args():
+    a = request.args
+    hours = a.get("hours", "")
+    since = a.get("since") or None
+    if not since and hours:
+        since = (datetime.utcnow() - timedelta(hours=max(1, min(int(hours), 24*30)))).isoformat(timespec="seconds")
+    before = a.get("before", "")
+    return dict(q=a.get("q", "")[:500], since=since, until=a.get("until") or None,
+                source=a.get("source") or None, before=int(before) if before.isdigit() else None)
+
+# -------- Edge ingest (aggregator) ----------
+MAX_INGEST_BYTES = 64 * 1024 * 1024      # decompressed batch limit
+INGEST_EVENTS  = counter("nmas_ingest_events_total", "Forwarded events written to logs")
+INGEST_DUPES   = counter("nmas_ingest_duplicates_total", "Forwarded events skipped as already ingested")
+INGEST_BATCHES = counter("nmas_ingest_batches_total", "Forwarded batches accepted")
+INGEST_SECONDS = histogram("nmas_ingest_seconds", "Decode + bulk insert latency per forwarded batch")
+INGEST_HOOKS = []   # fn(ts, source, msg, username, port) per stored event; "nmas all" feeds its detector
+
+def valid_event(e):
+    """[seq, timestamp, source, message, username, port] as the forwarder sends it;
+    the timestamp is naive UTC like the listener's (detection compares naive times)."""
+    if not (isinstance(e, list) and len(e) == 6 and type(e[0]) is int
+            and all(isinstance(v, str) for v in e[1:4])
+            and all(v is None or isinstance(v, str) for v in e[4:])):
+        return False
+    try:
+        return datetime.fromisoformat(e[1]).tzinfo is None
+    except ValueError:
+        return False
+
+def ensure_ingest(conn):
+    """logs (+ FTS) and the per-spool high-water mark used to drop re-sent events."""
+    logs_ready(conn)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_cursor (
+            edge TEXT, spool TEXT, last_seq INTEGER, updated TEXT,
+            PRIMARY KEY (edge, spool)
+        )
+    """)
+
+def ingest_batch(conn, payload):
+    """Bulk-insert one forwarder batch in a single transaction. Returns
+    (acked_seq, inserted); events at or below the spool's cursor are skipped."""
+    edge, spool = str(payload["edge"])[:128], str(payload["spool"])[:64]
+    events = payload["events"]
+    # take the write lock before reading the cursor: a re-send racing the first copy
+    # (forwarder timeout) then waits and sees the updated last_seq
+    conn.execute("BEGIN IMMEDIATE")
+    row = conn.execute("SELECT last_seq FROM ingest_cursor WHERE edge = ? AND spool = ?", (edge, spool)).fetchone()
+    last = row[0] if row else 0
+    fresh = [e for e in events if int(e[0]) > last]
+    if fresh:
+        conn.executemany(INSERT_LOG, [tuple(e[1:6]) for e in fresh])
+        last = max(int(e[0]) for e in fresh)
+        conn.execute("INSERT OR REPLACE INTO ingest_cursor (edge, spool, last_seq, updated) VALUES (?,?,?,?)",
+                     (edge, spool, last, utcnow()))
+    conn.commit()
+    for hook in INGEST_HOOKS:
+        for e in fresh:
+            hook(*e[1:6])
+    INGEST_EVENTS.inc(len(fresh))
+    INGEST_DUPES.inc(len(events) - len(fresh))
+    INGEST_BATCHES.inc()
+    return max([last] + [int(e[0]) for e in events]), len(fresh)
+
 # -------- Basic Auth ----------
 def check_auth(auth_header: str) -> bool:
     if not auth_header or not auth_header.startswith("Basic "):
@@ -100,6 +388,18 @@ def require_auth():
     resp.headers["WWW-Authenticate"] = 'Basic realm="NMAS Dashboard"'
     return resp
 
+# -------- Request metrics ----------
+@app.before_request
+def _start_timer():
+    g.t0 = time.perf_counter()
+
+@app.after_request
+def _observe_latency(resp):
+    if "t0" in g:
+        histogram("nmas_dashboard_request_seconds", "Dashboard response time",
+                  endpoint=request.endpoint or "unknown").observe(time.perf_counter() - g.t0)
+    return resp
+
 @app.before_request
 def _auth_gate():
     if request.path in ("/healthz",):
@@ -112,6 +412,11 @@ def _auth_gate():
 def healthz():
     return {"ok": True, "db": str(DB_PATH)}, 200
 
+@app.get("/metrics")
+def metrics():
+    # Prometheus text format; counts what ran in this process (listener/detector too in "all" mode)
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/")
 def index():
     # filters
@@ -157,6 +462,7 @@ def index():
             t = r["ts"][:13] + ":00:00"
             buckets[t] = buckets.get(t, 0) + 1
         series = sorted(buckets.items())
+        top = top_sources(conn, params[0])
 
     return render_template(
         "index.html",
@@ -164,6 +470,7 @@ def index():
         selected_type=alert_type,
         hours=hours,
         series=series,
+        top=top,
         page=page,
         page_size=page_size,
         has_more=has_more,
@@ -171,6 +478,22 @@ def index():
         dir=dir_
     )
 
+@app.get("/logs")
+def logs():
+    args = _log_search_args()
+    with get_db() as conn:
+        rows, next_before = search_logs(conn, **args)
+    return render_template("logs.html", rows=rows, next_before=next_before, args=args,
+                           hours=request.args.get("hours", ""))
+
+@app.get("/api/logs")
+def api_logs():
+    args = _log_search_args()
+    limit = max(1, min(int(request.args.get("limit", LOG_PAGE_SIZE)), 1000))
+    with get_db() as conn:
+        rows, next_before = search_logs(conn, limit=limit, **args)
+    return jsonify({"rows": [dict(r) for r in rows], "next_before": next_before})
+
 @app.get("/export.csv")
 def export_csv():
     q_type = request.args.get("type","ALL")
@@ -205,6 +528,31 @@ def export_csv():
     return Response(gen(), mimetype="text/csv",
                     headers={"Content-Disposition":"attachment; filename=alerts_export.csv"})
 
+@app.post("/api/ingest")
+def api_ingest():
+    with INGEST_SECONDS.time():
+        try:
+            body = request.get_data()
+            if request.headers.get("Content-Encoding", "").lower() == "gzip":
+                d = zlib.decompressobj(wbits=31)
+                body = d.decompress(body, MAX_INGEST_BYTES)
+                if d.unconsumed_tail:
+                    return jsonify({"ok": False, "error": "batch too large"}), 413
+            payload = json.loads(body)
+            if not isinstance(payload.get("events"), list) or "edge" not in payload or "spool" not in payload:
+                raise ValueError("expected edge, spool and events")
+            if not all(valid_event(e) for e in payload["events"]):
+                raise ValueError("events must be [seq, timestamp, source, message, username, port]")
+        except (zlib.error, ValueError, AttributeError) as e:
+            return jsonify({"ok": False, "error": f"bad batch: {e}"}), 400
+        try:
+            with get_db() as conn:
+                ensure_ingest(conn)
+                acked, inserted = ingest_batch(conn, payload)
+        except (sqlite3.Error, TypeError, IndexError, ValueError) as e:
+            return jsonify({"ok": False, "error": str(e)}), 500
+    return jsonify({"ok": True, "acked": acked, "inserted": inserted})
+
 # -------- Simulate endpoints ----------
 @app.post("/api/simulate/failed-login")
 def simulate_failed_login():
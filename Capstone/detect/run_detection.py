@@ -11,11 +11,12 @@
 # permission is prohibited.
 # ---------------------------------------------------------------------------
 
-import json, sys
+import argparse, json, sys, time
 from pathlib import Path
 import sqlite3
 from datetime import datetime, timedelta
 from Capstone.alerts.notifier import log_alerts, export_json, send_email, post_webhook
+from Capstone.metrics.registry import counter, gauge, histogram, REGISTRY
 
 #exe path
 
@@ -33,12 +34,31 @@ CONFIG_PATH = APP_ROOT / "config.json"
 def load_config():
     return json.loads(CONFIG_PATH.read_text(encoding="utf-8"))
 
+def load_config_or_none():
+    """load_config(), or None (no notifications) if config.json is missing or invalid."""
+    try:
+        return load_config()
+    except Exception as e:
+        print(f"[DETECT] notifications disabled ({e})")
+        return None
+
 # Config from your FRs
 FAILED_LOGIN_THRESHOLD = 5       # >=5
 FAILED_LOGIN_WINDOW_SEC = 180    # 3 min
 PORTSCAN_DISTINCT_PORTS = 12     # >=12
 PORTSCAN_WINDOW_SEC = 60         # 60s
 
+# Metrics
+PASS_SECONDS    = histogram("nmas_detect_pass_seconds", "Full detection pass (detectors + upsert + notify)")
+UPSERT_SECONDS  = histogram("nmas_detect_upsert_seconds", "upsert_alerts latency")
+ALERTS_FOUND    = counter("nmas_detect_alerts_found_total", "Alerts produced by detectors (before dedupe)")
+ALERTS_INSERTED = counter("nmas_detect_alerts_inserted_total", "New alert rows written")
+PASS_FAILURES   = counter("nmas_detect_pass_failures_total", "Detection passes that raised (daemon keeps running)")
+LAST_RUN        = gauge("nmas_detect_last_run_timestamp_seconds", "Unix time of the last detection pass")
+
+def detector_timer(name):
+    return histogram("nmas_detect_detector_seconds", "Per-detector query latency", detector=name).time()
+
 def ensure_alerts(conn):
     conn.execute("""
         CREATE TABLE IF NOT EXISTS alerts (
@@ -55,6 +75,7 @@ def ensure_alerts(conn):
 
 def iso(dt): return dt.isoformat(timespec="seconds")
 
+@detector_timer("failed_login_burst")
 def detect_failed_login_bursts(conn, now):
     win_start = now - timedelta(seconds=FAILED_LOGIN_WINDOW_SEC)
 
@@ -71,20 +92,21 @@ def detect_failed_login_bursts(conn, now):
         (iso(win_start), iso(now), FAILED_LOGIN_THRESHOLD)
     ).fetchall()
 
-    alerts = []
-    for source, username, cnt in rows:
-        alerts.append({
-            "ts": iso(now),
-            "type": "FAILED_LOGIN_BURST",
-            "source": source,
-            "username": username,
-            "window_start": iso(win_start),
-            "window_end": iso(now),
-            "count": int(cnt),
-            "details": f"{cnt} failed logins for user={username} within {FAILED_LOGIN_WINDOW_SEC}s"
-        })
-    return alerts
-
+    return [failed_login_alert(now, win_start, source, username, cnt) for source, username, cnt in rows]
+
+def failed_login_alert(now, win_start, source, username, cnt):
+    return {
+        "ts": iso(now),
+        "type": "FAILED_LOGIN_BURST",
+        "source": source,
+        "username": username,
+        "window_start": iso(win_start),
+        "window_end": iso(now),
+        "count": int(cnt),
+        "details": f"{cnt} failed logins for user={username} within {FAILED_LOGIN_WINDOW_SEC}s"
+    }
+
+@detector_timer("port_scan")
 def detect_port_scans(conn, now):
     win_start = now - timedelta(seconds=PORTSCAN_WINDOW_SEC)
     rows = conn.execute(
@@ -99,20 +121,21 @@ def detect_port_scans(conn, now):
         (iso(win_start), iso(now), PORTSCAN_DISTINCT_PORTS)
     ).fetchall()
 
-    alerts = []
-    for source, distinct_ports in rows:
-        alerts.append({
-            "ts": iso(now),
-            "type": "PORT_SCAN",
-            "source": source,
-            "username": None,
-            "window_start": iso(win_start),
-            "window_end": iso(now),
-            "count": int(distinct_ports),
-            "details": f"{distinct_ports} distinct destination ports within {PORTSCAN_WINDOW_SEC}s"
-        })
-    return alerts
-
+    return [port_scan_alert(now, win_start, source, distinct_ports) for source, distinct_ports in rows]
+
+def port_scan_alert(now, win_start, source, distinct_ports):
+    return {
+        "ts": iso(now),
+        "type": "PORT_SCAN",
+        "source": source,
+        "username": None,
+        "window_start": iso(win_start),
+        "window_end": iso(now),
+        "count": int(distinct_ports),
+        "details": f"{distinct_ports} distinct destination ports within {PORTSCAN_WINDOW_SEC}s"
+    }
+
+@UPSERT_SECONDS.time()
 def upsert_alerts(conn, found):
     if not found: return 0
     inserted = 0
@@ -133,26 +156,24 @@ def upsert_alerts(conn, found):
     conn.commit()
     return inserted
 
-def main():
-    now = datetime.utcnow()
-    conn = sqlite3.connect(DB)
-
-    fl = detect_failed_login_bursts(conn, now)
-    ps = detect_port_scans(conn, now)
-
-    new_alerts = fl + ps
-    added = upsert_alerts(conn, new_alerts)
-
-    config = load_config()
+def notify(name, fn, *args, **kwargs):
+    """Run one notifier; a failing channel is reported but does not abort the pass."""
+    try:
+        fn(*args, **kwargs)
+    except Exception as e:
+        print(f"[NOTIFY] {name} failed: {e}")
 
+def dispatch_alerts(new_alerts, config):
+    """Fan a detection pass's alerts out to the notifiers enabled in config."""
     # Logging to file/console/JSON
     if config["logging"]["enabled"]:
-        log_alerts(new_alerts)
-        export_json(new_alerts)
+        notify("log", log_alerts, new_alerts)
+        notify("json", export_json, new_alerts)
 
     # Email
     if config["email"]["enabled"]:
-        send_email(
+        notify(
+            "email", send_email,
             new_alerts,
             host=config["email"]["host"],
             port=config["email"]["port"],
@@ -162,10 +183,54 @@ def main():
 
     # Webhook
     if config["webhook"]["enabled"] and config["webhook"]["url"]:
-        post_webhook(new_alerts, config["webhook"]["url"])
+        notify("webhook", post_webhook, new_alerts, config["webhook"]["url"])
 
+@PASS_SECONDS.time()
+def main():
+    now = datetime.utcnow()
+    conn = sqlite3.connect(DB)
+
+    fl = detect_failed_login_bursts(conn, now)
+    ps = detect_port_scans(conn, now)
+
+    new_alerts = fl + ps
+    added = upsert_alerts(conn, new_alerts)
+    ALERTS_FOUND.inc(len(new_alerts))
+    ALERTS_INSERTED.inc(added)
+
+    config = load_config_or_none()
+    if config: dispatch_alerts(new_alerts, config)
+
+    LAST_RUN.set(int(time.time()))
     print(f"Detection run @ {now.isoformat(timespec='seconds')} -> {added} new alerts")
     conn.close()
 
+def daemon(interval_sec=30, stats_interval_sec=60):
+    """Run a detection pass every interval_sec until Ctrl+C, with a periodic stats line."""
+    next_stats = time.monotonic() + stats_interval_sec
+    try:
+        while True:
+            started = time.monotonic()
+            try:
+                main()
+            except Exception as e:
+                # a locked/missing DB or bad config must not end the daemon
+                PASS_FAILURES.inc()
+                print(f"[DETECT] pass failed: {e!r}")
+            if stats_interval_sec and time.monotonic() >= next_stats:
+                print(f"[STATS] {REGISTRY.stats_line('nmas_detect', 'nmas_notifier')}")
+                next_stats = time.monotonic() + stats_interval_sec
+            time.sleep(max(0.0, interval_sec - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        print("\n[INFO] Detection daemon stopped.")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    ap = argparse.ArgumentParser(description="NMAS detection pass")
+    ap.add_argument("--loop", type=float, metavar="SECONDS",
+                    help="keep running, one pass every SECONDS")
+    ap.add_argument("--stats-interval", type=float, default=60)
+    args = ap.parse_args()
+    if args.loop:
+        daemon(args.loop, args.stats_interval)
+    else:
+        main()
\ No newline at end of file
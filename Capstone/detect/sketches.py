@@ -0,0 +1,219 @@
+# sketches.py
+# ---------------------------------------------------------------------------
+# Network Monitoring & Alert System (NMAS)
+# Capstone Project – Liberty University
+#
+# Copyright (c) 2025 Simon Peter Hemingway. All rights reserved.
+#
+# This code was developed as part of an academic course at Liberty University.
+# It is provided for educational purposes only. Unauthorized use,
+# reproduction, or distribution of this code without express written
+# permission is prohibited.
+# ---------------------------------------------------------------------------
+#
+# Fixed-memory approximate aggregation for high-cardinality traffic:
+#   HyperLogLog   - distinct ports per source (relative error ~ hll_error)
+#   CountMinSketch- per-key counts, never under-estimates (+ eps*N at most, prob 1-delta)
+#   SpaceSaving   - top-k heavy hitters with a per-item error bound
+#   HeavyHitters  - Count-Min + a k-item candidate set (most-targeted users)
+# Enabled through the "sketches" section of config.json (see DEFAULTS).
+
+import hashlib, math, operator
+from array import array
+
+DEFAULTS = {
+    "enabled": False,      # use sketches instead of exact SQL aggregation
+    "hll_error": 0.02,     # HyperLogLog relative standard error
+    "cms_epsilon": 0.001,  # Count-Min over-count bound, as a fraction of all events
+    "cms_delta": 0.01,     # probability the bound is exceeded
+    "top_k": 10,           # rows in the dashboard "Top sources" panel
+}
+
+def settings(config):
+    """DEFAULTS overlaid with config["sketches"] (config may be None)."""
+    return {**DEFAULTS, **((config or {}).get("sketches") or {})}
+
+def _hash64(item):
+    return int.from_bytes(hashlib.blake2b(str(item).encode("utf-8"), digest_size=8).digest(), "big")
+
+def _hash128(item):
+    d = hashlib.blake2b(str(item).encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(d[:8], "big"), int.from_bytes(d[8:], "big") | 1
+
+# ------------ HyperLogLog ------------
+class HyperLogLog:
+    """Registers start sparse (a dict of the touched ones) and switch to a dense
+    bytearray once more than m/32 are set, so the many sources that only touch
+    a few ports stay small and cheap to merge."""
+
+    def __init__(self, error=0.02):
+        # standard error is 1.04 / sqrt(m), m = 2^p registers
+        self.p = min(16, max(4, math.ceil(math.log2((1.04 / error) ** 2))))
+        self.m = 1 << self.p
+        self.alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(self.m, 0.7213 / (1 + 1.079 / self.m))
+        self.sparse = {}          # register index -> rank, until densified
+        self.registers = None
+
+    @property
+    def error(self):
+        return 1.04 / math.sqrt(self.m)
+
+    def _densify(self):
+        regs = bytearray(self.m)
+        for i, r in self.sparse.items():
+            regs[i] = r
+        self.registers, self.sparse = regs, None
+
+    def _set(self, idx, rank):
+        if self.sparse is None:
+            if rank > self.registers[idx]:
+                self.registers[idx] = rank
+        elif rank > self.sparse.get(idx, 0):
+            self.sparse[idx] = rank
+            if len(self.sparse) > self.m // 32:
+                self._densify()
+
+    def add(self, item):
+        x = _hash64(item)
+        rest = x & ((1 << (64 - self.p)) - 1)
+        self._set(x >> (64 - self.p), (64 - self.p) - rest.bit_length() + 1)
+
+    def merge(self, other):
+        if other.p != self.p:
+            raise ValueError("cannot merge HyperLogLogs with different precision")
+        if other.sparse is not None:
+            for i, r in other.sparse.items():
+                self._set(i, r)
+        else:
+            if self.sparse is not None:
+                self._densify()
+            self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        if self.sparse is not None:
+            zeros = self.m - len(self.sparse)
+            inv = zeros + sum(2.0 ** -r for r in self.sparse.values())
+        else:
+            zeros = self.registers.count(0)
+            inv = sum(2.0 ** -r for r in self.registers)
+        est = self.alpha * self.m * self.m / inv
+        if est <= 2.5 * self.m and zeros:
+            est = self.m * math.log(self.m / zeros)   # linear counting for small sets
+        return int(round(est))
+
+# ------------ Count-Min ------------
+class CountMinSketch:
+    def __init__(self, epsilon=0.001, delta=0.01):
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.rows = [array("q", bytes(8 * self.width)) for _ in range(self.depth)]
+        self.total = 0
+
+    def _cells(self, item):
+        h1, h2 = _hash128(item)
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, item, n=1):
+        """Count item n more times and return its new estimate."""
+        self.total += n
+        est = None
+        for row, j in zip(self.rows, self._cells(item)):
+            row[j] += n
+            est = row[j] if est is None else min(est, row[j])
+        return est
+
+    def estimate(self, item):
+        return min(row[j] for row, j in zip(self.rows, self._cells(item)))
+
+    def _combine(self, other, op):
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("cannot combine Count-Min sketches with different dimensions")
+        self.rows = [array("q", map(op, a, b)) for a, b in zip(self.rows, other.rows)]
+        self.total = op(self.total, other.total)
+        return self
+
+    def merge(self, other):
+        return self._combine(other, operator.add)
+
+    def subtract(self, other):
+        """Remove a sketch previously merged in (counts are linear, so this is exact)."""
+        return self._combine(other, operator.sub)
+
+    def copy(self):
+        dup = object.__new__(CountMinSketch)
+        dup.width, dup.depth, dup.total = self.width, self.depth, self.total
+        dup.rows = [array("q", row) for row in self.rows]
+        return dup
+
+# ------------ Space-Saving ------------
+class SpaceSaving:
+    """Metwally et al. stream summary: exact for items seen while fewer than k
+    are tracked; otherwise count - error <= true count <= count."""
+
+    def __init__(self, k=10):
+        self.k = k
+        self.counts = {}   # item -> [count, error]
+
+    def add(self, item, n=1):
+        c = self.counts.get(item)
+        if c is not None:
+            c[0] += n
+        elif len(self.counts) < self.k:
+            self.counts[item] = [n, 0]
+        else:
+            victim = min(self.counts, key=lambda i: self.counts[i][0])
+            floor = self.counts.pop(victim)[0]
+            self.counts[item] = [floor + n, floor]
+
+    def _floor(self):
+        # an untracked item was seen at most this often
+        return min(c for c, _ in self.counts.values()) if len(self.counts) >= self.k else 0
+
+    def merge(self, other):
+        """Agarwal et al. merge: an item missing from a full summary is charged
+        that summary's minimum as both count and error, so the bounds still hold."""
+        fa, fb = self._floor(), other._floor()
+        merged = {}
+        for item in self.counts.keys() | other.counts.keys():
+            ca, ea = self.counts.get(item, (fa, fa))
+            cb, eb = other.counts.get(item, (fb, fb))
+            merged[item] = [ca + cb, ea + eb]
+        self.counts = dict(sorted(merged.items(), key=lambda kv: -kv[1][0])[:self.k])
+        return self
+
+    def top(self, n=None):
+        """[(item, count, error)] by descending count."""
+        ranked = sorted(((i, c, e) for i, (c, e) in self.counts.items()), key=lambda t: -t[1])
+        return ranked[:n] if n else ranked
+
+class HeavyHitters:
+    """Top-k by Count-Min estimate; errors are bounded by cms.total * epsilon."""
+
+    def __init__(self, k=10, epsilon=0.001, delta=0.01, cms=None):
+        self.k = k
+        self.epsilon = epsilon
+        self.cms = cms or CountMinSketch(epsilon, delta)
+        self.candidates = {}
+
+    def add(self, item, n=1):
+        est = self.cms.add(item, n)
+        if item in self.candidates or len(self.candidates) < self.k:
+            self.candidates[item] = est
+            return
+        victim = min(self.candidates, key=self.candidates.get)
+        if est > self.candidates[victim]:
+            del self.candidates[victim]
+            self.candidates[item] = est
+
+    def merge(self, other):
+        self.cms.merge(other.cms)
+        est = {i: self.cms.estimate(i) for i in self.candidates.keys() | other.candidates.keys()}
+        self.candidates = dict(sorted(est.items(), key=lambda kv: -kv[1])[:self.k])
+        return self
+
+    def top(self, n=None):
+        """[(item, estimate, max over-count)] by descending estimate."""
+        bound = math.ceil(self.epsilon * self.cms.total)
+        ranked = sorted(((i, self.cms.estimate(i), bound) for i in self.candidates), key=lambda t: -t[1])
+        return ranked[:n] if n else ranked
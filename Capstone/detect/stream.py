@@ -0,0 +1,140 @@
+# stream.py
+# ---------------------------------------------------------------------------
+# Network Monitoring & Alert System (NMAS)
+# Capstone Project – Liberty University
+#
+# Copyright (c) 2025 Simon Peter Hemingway. All rights reserved.
+#
+# This code was developed as part of an academic course at Liberty University.
+# It is provided for educational purposes only. Unauthorized use,
+# reproduction, or distribution of this code without express written
+# permission is prohibited.
+# ---------------------------------------------------------------------------
+#
+# Streaming detection for the single-process "all" mode. Events arrive on an
+# in-memory queue straight from the listener and are kept in sliding windows,
+# so a pass never re-reads the logs table. Thresholds, windows and alert
+# format are the ones in run_detection.py.
+
+import sqlite3, time
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+from Capstone.detect import run_detection as rd
+from Capstone.detect.sketches import HyperLogLog, settings as sketch_settings
+from Capstone.ingest.writer import drain
+from Capstone.metrics.registry import histogram
+
+EVALUATE_SECONDS = histogram("nmas_detect_stream_evaluate_seconds", "Streaming detector window evaluation")
+
+SKETCH_BUCKET_SEC = 5   # HyperLogLog slice width; the port-scan window is covered by whole slices
+
+class StreamingDetector:
+    """Sliding-window equivalent of detect_failed_login_bursts / detect_port_scans.
+
+    With hll_error, ports are kept as one HyperLogLog per source per
+    SKETCH_BUCKET_SEC slice (merged at evaluation) instead of a port dict,
+    so memory per source stays fixed during a wide scan."""
+
+    def __init__(self, hll_error=None):
+        self.hll_error = hll_error
+        self.failed = defaultdict(deque)   # (source, username) -> timestamps
+        self.ports = defaultdict(dict)     # source -> {port: last seen} | {slice start: HyperLogLog}
+
+    def observe(self, ts, source, msg, username, port):
+        t = datetime.fromisoformat(ts)
+        # same filter as the SQL: username parsed AND message LIKE 'Failed password%'
+        if username is not None and msg[:15].lower() == "failed password":
+            self.failed[(source, username)].append(t)
+        if port is None:
+            return
+        seen = self.ports[source]
+        if self.hll_error:
+            key = t.replace(microsecond=0) - timedelta(seconds=t.second % SKETCH_BUCKET_SEC)
+            hll = seen.get(key)
+            if hll is None:
+                hll = seen[key] = HyperLogLog(self.hll_error)
+            hll.add(port)
+        elif t > seen.get(port, datetime.min):
+            seen[port] = t
+
+    def prune(self, now):
+        fl_start = now - timedelta(seconds=rd.FAILED_LOGIN_WINDOW_SEC)
+        for key in list(self.failed):
+            times = self.failed[key]
+            while times and times[0] < fl_start:
+                times.popleft()
+            if not times: del self.failed[key]
+        ps_start = now - timedelta(seconds=rd.PORTSCAN_WINDOW_SEC)
+        for source in list(self.ports):
+            seen = {k: v for k, v in self.ports[source].items() if self._last_seen(k, v) >= ps_start}
+            if seen: self.ports[source] = seen
+            else: del self.ports[source]
+
+    def _last_seen(self, key, value):
+        # exact: {port: last seen}; sketch: {slice start: hll}, alive until the slice ends
+        return key + timedelta(seconds=SKETCH_BUCKET_SEC) if self.hll_error else value
+
+    def _distinct_ports(self, seen, now):
+        if not self.hll_error:
+            return sum(1 for t in seen.values() if t <= now)
+        merged = HyperLogLog(self.hll_error)
+        for start, hll in seen.items():
+            if start <= now:
+                merged.merge(hll)
+        return merged.count()
+
+    @EVALUATE_SECONDS.time()
+    def evaluate(self, now):
+        """Alerts for the windows ending at `now` (same dicts as the SQL detectors)."""
+        self.prune(now)
+        alerts = []
+        fl_start = now - timedelta(seconds=rd.FAILED_LOGIN_WINDOW_SEC)
+        for (source, username), times in self.failed.items():
+            cnt = sum(1 for t in times if t <= now)
+            if cnt >= rd.FAILED_LOGIN_THRESHOLD:
+                alerts.append(rd.failed_login_alert(now, fl_start, source, username, cnt))
+        ps_start = now - timedelta(seconds=rd.PORTSCAN_WINDOW_SEC)
+        for source, seen in self.ports.items():
+            distinct = self._distinct_ports(seen, now)
+            if distinct >= rd.PORTSCAN_DISTINCT_PORTS:
+                alerts.append(rd.port_scan_alert(now, ps_start, source, distinct))
+        return alerts
+
+def run_stream(q, db_path=None, interval_sec=30, detector=None):
+    """Thread target: observe queued events, run a pass every interval_sec and
+    once more after the STOP sentinel so nothing queued is left unevaluated."""
+    conn = sqlite3.connect(db_path or rd.DB)
+    rd.ensure_alerts(conn)
+    config = rd.load_config_or_none()
+    if detector is None:
+        sk = sketch_settings(config)
+        detector = StreamingDetector(hll_error=sk["hll_error"] if sk["enabled"] else None)
+
+    def run_pass():
+        with rd.PASS_SECONDS.time():
+            now = datetime.utcnow().replace(microsecond=0)
+            found = detector.evaluate(now)
+            added = rd.upsert_alerts(conn, found)
+            rd.ALERTS_FOUND.inc(len(found))
+            rd.ALERTS_INSERTED.inc(added)
+            if config: rd.dispatch_alerts(found, config)
+            rd.LAST_RUN.set(int(time.time()))
+        print(f"Detection run @ {now.isoformat(timespec='seconds')} -> {added} new alerts")
+
+    try:
+        next_pass = time.monotonic() + interval_sec
+        stopped = False
+        while not stopped:
+            events, stopped = drain(q, 1000, max(0.0, min(0.5, next_pass - time.monotonic())))
+            for ev in events:
+                detector.observe(*ev)
+            if stopped or time.monotonic() >= next_pass:
+                try:
+                    run_pass()
+                except Exception as e:
+                    # events stay in the windows, so the next pass re-evaluates them
+                    rd.PASS_FAILURES.inc()
+                    print(f"[DETECT] pass failed: {e!r}")
+                next_pass = time.monotonic() + interval_sec
+    finally:
+        conn.close()
@@ -0,0 +1,191 @@
+# forwarder.py
+# ---------------------------------------------------------------------------
+# Network Monitoring & Alert System (NMAS)
+# Capstone Project – Liberty University
+#
+# Copyright (c) 2025 Simon Peter Hemingway. All rights reserved.
+#
+# This code was developed as part of an academic course at Liberty University.
+# It is provided for educational purposes only. Unauthorized use,
+# reproduction, or distribution of this code without express written
+# permission is prohibited.
+# ---------------------------------------------------------------------------
+#
+# Edge -> central forwarding. An edge listener appends parsed events to a
+# local spool (spool.db) instead of events.db; the Forwarder ships them in
+# gzip'd JSON batches to the central dashboard's POST /api/ingest and deletes
+# them only once acknowledged, so an outage just grows the spool and shipping
+# resumes where it stopped. Batches carry spool sequence numbers, which the
+# aggregator uses to drop re-sent events.
+#
+# config.json:
+#   "forwarder": {"url": "http://central:5000/api/ingest", "edge_id": "branch-1",
+#                 "username": "admin", "password": "admin", "batch_size": 500}
+
+import base64, gzip, json, socket, sqlite3, threading, time, urllib.error, urllib.request, uuid
+from Capstone.ingest.syslog_listener import APP_ROOT, CONFIG_PATH
+from Capstone.metrics.registry import counter, gauge, histogram
+
+DEFAULTS = {
+    "url": "http://127.0.0.1:5000/api/ingest",
+    "edge_id": socket.gethostname(),
+    "username": "admin", "password": "admin",
+    "spool_path": str(APP_ROOT / "spool.db"),
+    "batch_size": 500,
+    "interval_sec": 1.0,       # idle poll when the spool is empty
+    "max_backoff_sec": 30.0,   # retry ceiling while central is unreachable
+    "stats_interval_sec": 60,
+}
+
+SHIPPED   = counter("nmas_forwarder_events_shipped_total", "Events acknowledged by the aggregator")
+BATCHES   = counter("nmas_forwarder_batches_total", "Batches acknowledged by the aggregator")
+BYTES_OUT = counter("nmas_forwarder_bytes_sent_total", "Compressed payload bytes sent")
+FAILURES  = counter("nmas_forwarder_failures_total", "Batches that failed and will be retried")
+SPOOLED   = counter("nmas_forwarder_events_spooled_total", "Events appended to the spool")
+SHIP_SECONDS = histogram("nmas_forwarder_ship_seconds", "Compress + POST + ack latency per batch")
+
+def load_config():
+    try:
+        data = json.loads(CONFIG_PATH.read_text(encoding="utf-8"))
+    except Exception:
+        data = {}
+    return {**DEFAULTS, **data.get("forwarder", {})}
+
+# ------------ Spool ------------
+class Spool:
+    """Durable FIFO of parsed events; one SQLite connection per thread."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS spool (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT, source TEXT, message TEXT, username TEXT, port TEXT
+            )
+        """)
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("INSERT OR IGNORE INTO meta VALUES ('spool_id', ?)", (uuid.uuid4().hex,))
+        conn.commit()
+        # identifies this spool file, so a fresh spool (seq back at 1) is not mistaken for re-sends
+        self.spool_id = conn.execute("SELECT value FROM meta WHERE key = 'spool_id'").fetchone()[0]
+        gauge("nmas_forwarder_spool_events", "Events waiting in the spool").set_function(self.size)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def append(self, ts, source, msg, username, port):
+        """Listener on_event: spool one parsed message."""
+        conn = self._conn()
+        conn.execute("INSERT INTO spool (timestamp, source, message, username, port) VALUES (?, ?, ?, ?, ?)",
+                     (ts, source, msg, username, port))
+        conn.commit()
+        SPOOLED.inc()
+
+    def peek(self, limit):
+        return self._conn().execute(
+            "SELECT seq, timestamp, source, message, username, port FROM spool ORDER BY seq LIMIT ?",
+            (limit,)).fetchall()
+
+    def ack(self, upto_seq):
+        conn = self._conn()
+        conn.execute("DELETE FROM spool WHERE seq <= ?", (upto_seq,))
+        conn.commit()
+
+    def size(self):
+        return self._conn().execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+# ------------ Shipping ------------
+class Forwarder:
+    def __init__(self, spool, url, edge_id, username=None, password=None, batch_size=500,
+                 interval_sec=1.0, max_backoff_sec=30.0, timeout=10):
+        self.spool, self.url, self.edge_id = spool, url, edge_id
+        self.batch_size, self.interval_sec = batch_size, interval_sec
+        self.max_backoff_sec, self.timeout = max_backoff_sec, timeout
+        self.headers = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+        if username is not None:
+            token = base64.b64encode(f"{username}:{password}".encode("utf-8")).decode("ascii")
+            self.headers["Authorization"] = f"Basic {token}"
+
+    def ship_once(self):
+        """Send the oldest batch. Returns events acknowledged (0 = spool empty);
+        raises on transport/aggregator errors, leaving the spool untouched."""
+        rows = self.spool.peek(self.batch_size)
+        if not rows: return 0
+        payload = {"edge": self.edge_id, "spool": self.spool.spool_id, "events": [list(r) for r in rows]}
+        body = gzip.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"), compresslevel=6)
+        with SHIP_SECONDS.time():
+            req = urllib.request.Request(self.url, data=body, headers=self.headers, method="POST")
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                ack = json.loads(resp.read().decode("utf-8"))
+            if not ack.get("ok") or ack.get("acked") is None:
+                raise RuntimeError(f"aggregator refused batch: {ack.get('error', ack)}")
+            self.spool.ack(int(ack["acked"]))
+        BYTES_OUT.inc(len(body))
+        BATCHES.inc()
+        shipped = sum(1 for r in rows if r[0] <= int(ack["acked"]))
+        SHIPPED.inc(shipped)
+        return shipped
+
+    def run(self, stop, stats_interval=0):
+        """Thread target: ship until `stop` is set, backing off while central is down."""
+        backoff = self.interval_sec
+        last_stats, last_shipped = time.monotonic(), SHIPPED.value
+        while not stop.is_set():
+            try:
+                n = self.ship_once()
+                backoff = self.interval_sec
+            except (urllib.error.URLError, OSError, RuntimeError, ValueError) as e:
+                FAILURES.inc()
+                print(f"[FORWARD] {self.url} unavailable ({e}); retry in {backoff:.0f}s, "
+                      f"{self.spool.size()} events spooled")
+                stop.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff_sec)
+                continue
+            if stats_interval and time.monotonic() - last_stats >= stats_interval:
+                elapsed = time.monotonic() - last_stats
+                print(f"[FORWARD] {(SHIPPED.value - last_shipped) / elapsed:.1f} events/s shipped, "
+                      f"{self.spool.size()} spooled, {BYTES_OUT.value} bytes sent total")
+                last_stats, last_shipped = time.monotonic(), SHIPPED.value
+            if n < self.batch_size:
+                stop.wait(self.interval_sec)
+        self.spool.close()
+
+# ------------ Edge entry point ------------
+def main(supervisor=None):
+    """Listener that spools to spool.db and forwards to the central aggregator."""
+    from Capstone.ingest import syslog_listener as listener
+    from Capstone.nmas import Supervisor
+
+    cfg = load_config()
+    lcfg = listener.load_config()["listener"]
+    spool = Spool(cfg["spool_path"])
+    fwd = Forwarder(spool, cfg["url"], cfg["edge_id"], cfg.get("username"), cfg.get("password"),
+                    batch_size=int(cfg["batch_size"]), interval_sec=float(cfg["interval_sec"]),
+                    max_backoff_sec=float(cfg["max_backoff_sec"]))
+    print(f"[FORWARD] edge={cfg['edge_id']} spool={cfg['spool_path']} ({spool.size()} pending) -> {cfg['url']}")
+
+    sup = supervisor or Supervisor()
+    sock = listener.open_socket(lcfg["bind_host"], int(lcfg["port"]))
+    print(f"[LISTENER] Listening on {lcfg['bind_host']}:{lcfg['port']}")
+    sup.spawn("listener", listener.receive_loop, sock, spool.append, sup.stop)
+    stats_interval = float(cfg["stats_interval_sec"])
+    sup.spawn("forwarder", fwd.run, sup.stop, stats_interval)
+    sup.wait(stats_interval)    # [STATS] lines carry nmas_listener_* / nmas_forwarder_* (no HTTP server on the edge)
+    sock.close()
+    spool.close()
+
+if __name__ == "__main__":
+    main()
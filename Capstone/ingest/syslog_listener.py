@@ -11,9 +11,10 @@
 # permission is prohibited.
 # ---------------------------------------------------------------------------
 
-import socket, sqlite3, sys, re, json
+import socket, sqlite3, sys, re, json, time
 from datetime import datetime
 from pathlib import Path
+from Capstone.metrics.registry import counter, histogram, REGISTRY
 
 #exe path
 
@@ -32,7 +33,7 @@ CONFIG_PATH = APP_ROOT / "config.json"
 # ------------ Config helpers ------------
 def load_config():
     default = {
-        "listener": {"bind_host": "0.0.0.0", "port": 5514}
+        "listener": {"bind_host": "0.0.0.0", "port": 5514, "stats_interval_sec": 60}
     }
     try:
         data = json.loads(CONFIG_PATH.read_text(encoding="utf-8"))
@@ -56,10 +57,12 @@ def get_primary_ip():
     return ip
 
 # ------------ DB Setup & Migration ------------
-def ensure_db():
+def ensure_db(db_path=None):
+    """Create/migrate logs and its indexes. Returns True if FTS5 search is available."""
+    db_path = db_path or DB_PATH
     print(f"[INFO] Python: {sys.executable}")
-    print(f"[INFO] DB path: {DB_PATH}")
-    conn = sqlite3.connect(DB_PATH)
+    print(f"[INFO] DB path: {db_path}")
+    conn = sqlite3.connect(db_path)
     cur = conn.cursor()
     cur.execute("""
         CREATE TABLE IF NOT EXISTS logs (
@@ -77,15 +80,58 @@ def ensure_db():
         cur.execute("ALTER TABLE logs ADD COLUMN username TEXT")
     if "port" not in cols:
         cur.execute("ALTER TABLE logs ADD COLUMN port TEXT")
+    # time-window queries (detectors, dashboard top sources, log search)
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_logs_timestamp ON logs(timestamp)")
     conn.commit()
+    fts = ensure_fts(conn)
+    if fts:
+        print("[INFO] Full-text index 'logs_fts' ready.")
     conn.close()
     print("[INFO] Table 'logs' ready (id,timestamp,source,message,username,port).")
+    return fts
+
+def ensure_fts(conn):
+    """FTS5 external-content index over logs.message, kept in sync by triggers
+    (so per-packet inserts and the batched writer are both covered). Returns
+    False when this SQLite build has no FTS5; search then falls back to a scan."""
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'logs_fts'").fetchone()
+    try:
+        conn.executescript("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts
+                USING fts5(message, content='logs', content_rowid='id');
+            CREATE TRIGGER IF NOT EXISTS logs_fts_ai AFTER INSERT ON logs BEGIN
+                INSERT INTO logs_fts(rowid, message) VALUES (new.id, new.message);
+            END;
+            CREATE TRIGGER IF NOT EXISTS logs_fts_ad AFTER DELETE ON logs BEGIN
+                INSERT INTO logs_fts(logs_fts, rowid, message) VALUES ('delete', old.id, old.message);
+            END;
+            CREATE TRIGGER IF NOT EXISTS logs_fts_au AFTER UPDATE OF message ON logs BEGIN
+                INSERT INTO logs_fts(logs_fts, rowid, message) VALUES ('delete', old.id, old.message);
+                INSERT INTO logs_fts(rowid, message) VALUES (new.id, new.message);
+            END;
+        """)
+    except sqlite3.OperationalError as e:
+        print(f"[WARN] Full-text search unavailable ({e})")
+        return False
+    if not exists:
+        # index rows that were logged before the index existed
+        conn.execute("INSERT INTO logs_fts(logs_fts) VALUES ('rebuild')")
+        conn.commit()
+    return True
+
+# ------------ Metrics ------------
+PACKETS_RECEIVED = counter("nmas_listener_packets_received_total", "Datagrams returned by recvfrom")
+BYTES_RECEIVED   = counter("nmas_listener_bytes_received_total", "Payload bytes received")
+PACKETS_DROPPED  = counter("nmas_listener_packets_dropped_total", "Datagrams received but not stored")
+PARSE_SECONDS    = histogram("nmas_listener_parse_seconds", "parse_fields latency")
+INSERT_SECONDS   = histogram("nmas_listener_insert_seconds", "logs INSERT + commit latency")
 
 # ------------ Regex Parsers ------------
 FAILED_LOGIN = re.compile(r"Failed password for (?:invalid user )?([A-Za-z0-9_\-.$]+)", re.IGNORECASE)
 PORT_GENERIC  = re.compile(r"\bport\s+(\d{1,5})\b", re.IGNORECASE)
 PORT_FW       = re.compile(r"\bDPT=(\d{1,5})\b")
 
+@PARSE_SECONDS.time()
 def parse_fields(msg: str):
     username, port = None, None
     m1 = FAILED_LOGIN.search(msg)
@@ -94,40 +140,68 @@ def parse_fields(msg: str):
     if m2: port = m2.group(1)
     return username, port
 
+# ------------ Storage ------------
+INSERT_LOG = "INSERT INTO logs (timestamp, source, message, username, port) VALUES (?, ?, ?, ?, ?)"
+
+@INSERT_SECONDS.time()
+def store_event(ts, source, msg, username, port, db_path=None):
+    """Insert one parsed message (one connection + commit per packet)."""
+    with sqlite3.connect(db_path or DB_PATH) as conn:
+        conn.execute(INSERT_LOG, (ts, source, msg, username, port))
+
 # ------------ Listener ------------
+def open_socket(bind_host, port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((bind_host, port))
+    sock.settimeout(1.0)  # allows Ctrl+C / stop to break the loop
+    return sock
+
+def receive_loop(sock, on_event, stop=None, stats_interval=0):
+    """Receive datagrams until `stop` is set (or Ctrl+C), handing each parsed
+    message to on_event(ts, source, msg, username, port)."""
+    next_stats = time.monotonic() + stats_interval
+    while not (stop and stop.is_set()):
+        if stats_interval and time.monotonic() >= next_stats:
+            print(f"[STATS] {REGISTRY.stats_line('nmas_listener')}")
+            next_stats = time.monotonic() + stats_interval
+        try:
+            data, addr = sock.recvfrom(4096)
+        except socket.timeout:
+            continue
+        PACKETS_RECEIVED.inc()
+        BYTES_RECEIVED.inc(len(data))
+
+        msg = data.decode(errors="replace")
+        ts = datetime.utcnow().isoformat(timespec="seconds")   # detection and dashboard windows are UTC
+        username, dport = parse_fields(msg)
+
+        try:
+            on_event(ts, addr[0], msg, username, dport)
+        except Exception as e:
+            PACKETS_DROPPED.inc()
+            print(f"[DROP] {ts} {addr[0]} not stored: {e}")
+
+def print_and_store(ts, source, msg, username, port):
+    store_event(ts, source, msg, username, port)
+    print(f"[INSERT] {ts} {source} user={username} port={port} :: {msg}")
+
 def main():
     ensure_db()
 
     cfg = load_config()
     bind_host = cfg["listener"]["bind_host"]
     port = int(cfg["listener"]["port"])
+    stats_interval = float(cfg["listener"].get("stats_interval_sec") or 0)
     primary_ip = get_primary_ip()
 
     print(f"[LISTENER] Primary host IP (tell devices to send here): {primary_ip}:{port}")
     print(f"[LISTENER] Binding on {bind_host}:{port} (set in config.json: listener.bind_host/port)")
 
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.bind((bind_host, port))
-    sock.settimeout(1.0)  # allows Ctrl+C to break the loop
+    sock = open_socket(bind_host, port)
 
     print("[INFO] Listening for syslog messages... (Ctrl+C to stop)")
     try:
-        while True:
-            try:
-                data, addr = sock.recvfrom(4096)
-            except socket.timeout:
-                continue
-
-            msg = data.decode(errors="replace")
-            ts = datetime.now().isoformat(timespec="seconds")
-            username, dport = parse_fields(msg)
-
-            with sqlite3.connect(DB_PATH) as conn:
-                conn.execute(
-                    "INSERT INTO logs (timestamp, source, message, username, port) VALUES (?, ?, ?, ?, ?)",
-                    (ts, addr[0], msg, username, dport)
-                )
-            print(f"[INSERT] {ts} {addr[0]} user={username} port={dport} :: {msg}")
+        receive_loop(sock, print_and_store, stats_interval=stats_interval)
     except KeyboardInterrupt:
         print("\n[INFO] Shutting down...")
     finally:
@@ -136,4 +210,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,95 @@
+# writer.py
+# ---------------------------------------------------------------------------
+# Network Monitoring & Alert System (NMAS)
+# Capstone Project – Liberty University
+#
+# Copyright (c) 2025 Simon Peter Hemingway. All rights reserved.
+#
+# This code was developed as part of an academic course at Liberty University.
+# It is provided for educational purposes only. Unauthorized use,
+# reproduction, or distribution of this code without express written
+# permission is prohibited.
+# ---------------------------------------------------------------------------
+#
+# Storage writer for the single-process "all" mode: drains parsed events from
+# an in-memory queue and writes them to events.db in batches over one
+# connection (one commit per batch instead of one per packet).
+
+import queue, sqlite3, time
+from Capstone.ingest.syslog_listener import DB_PATH, INSERT_LOG
+from Capstone.metrics.registry import counter, histogram
+
+STOP = object()   # queue sentinel: flush what is left and exit
+
+ROWS_WRITTEN = counter("nmas_writer_rows_total", "Log rows written by the batch writer")
+ROWS_DROPPED = counter("nmas_writer_rows_dropped_total", "Log rows lost to a failed batch insert")
+RETRIES      = counter("nmas_writer_retries_total", "Batch inserts retried after a transient error (e.g. database is locked)")
+BATCH_SECONDS = histogram("nmas_writer_batch_seconds", "executemany + commit latency per batch")
+
+def drain(q, max_items, timeout):
+    """Block up to `timeout` for the first item, then take whatever else is
+    already queued (up to max_items). Returns (items, stopped)."""
+    items = []
+    try:
+        item = q.get(timeout=timeout)
+    except queue.Empty:
+        return items, False
+    while True:
+        if item is STOP:
+            return items, True
+        items.append(item)
+        if len(items) >= max_items:
+            return items, False
+        try:
+            item = q.get_nowait()
+        except queue.Empty:
+            return items, False
+
+class BatchWriter:
+    def __init__(self, q, db_path=None, batch_size=500, flush_interval=0.5,
+                 max_retries=5, retry_backoff=0.2, max_backoff=5.0):
+        self.q = q
+        self.db_path = db_path or DB_PATH
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries, self.retry_backoff, self.max_backoff = max_retries, retry_backoff, max_backoff
+
+    def write(self, conn, rows):
+        """Insert one batch; OperationalError (locked/busy, disk I/O) is retried
+        with backoff, other errors or exhausted retries drop the batch."""
+        if not rows: return
+        delay = self.retry_backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                with BATCH_SECONDS.time():
+                    conn.executemany(INSERT_LOG, rows)
+                    conn.commit()
+                ROWS_WRITTEN.inc(len(rows))
+                return
+            except sqlite3.OperationalError as e:
+                conn.rollback()
+                error = e
+                if attempt == self.max_retries: break
+                RETRIES.inc()
+                print(f"[WRITER] batch of {len(rows)} failed ({e}); retry in {delay:.1f}s")
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_backoff)
+            except sqlite3.Error as e:
+                conn.rollback()
+                error = e
+                break
+        ROWS_DROPPED.inc(len(rows))
+        print(f"[WRITER] batch of {len(rows)} dropped: {error}")
+
+    def run(self):
+        """Thread target; returns once STOP has been read and everything before it written."""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            stopped = False
+            while not stopped:
+                rows, stopped = drain(self.q, self.batch_size, self.flush_interval)
+                self.write(conn, rows)
+        finally:
+            conn.close()
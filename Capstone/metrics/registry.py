@@ -0,0 +1,203 @@
+# registry.py
+# ---------------------------------------------------------------------------
+# Network Monitoring & Alert System (NMAS)
+# Capstone Project – Liberty University
+#
+# Copyright (c) 2025 Simon Peter Hemingway. All rights reserved.
+#
+# This code was developed as part of an academic course at Liberty University.
+# It is provided for educational purposes only. Unauthorized use,
+# reproduction, or distribution of this code without express written
+# permission is prohibited.
+# ---------------------------------------------------------------------------
+#
+# Small in-process metrics registry (counters, gauges, latency histograms).
+# Each process has its own REGISTRY; the dashboard exposes it at /metrics in
+# Prometheus text format and the listener / detector print stats_line().
+
+import threading, time
+from bisect import bisect_left
+from functools import wraps
+
+# seconds; upper bounds of the latency buckets (+Inf is implicit)
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(v):
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _fmt_labels(labels):
+    if not labels: return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items())) + "}"
+
+def _fmt_num(v):
+    if v == float("inf"): return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+# ------------ Metric types ------------
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, labels=None):
+        self.name, self.labels = name, labels or {}
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, n=1):
+        with self._lock:
+            self._value += n
+
+    @property
+    def value(self):
+        return self._value
+
+    def samples(self):
+        yield self.name, self.labels, self._value
+
+class Gauge(Counter):
+    kind = "gauge"
+    _fn = None
+
+    def set(self, v):
+        with self._lock:
+            self._value = v
+
+    def set_function(self, fn):
+        """Read the value from fn() at collection time (e.g. a queue's qsize)."""
+        self._fn = fn
+
+    @property
+    def value(self):
+        return self._fn() if self._fn else self._value
+
+    def samples(self):
+        yield self.name, self.labels, self.value
+
+    def dec(self, n=1):
+        self.inc(-n)
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, labels=None, buckets=DEFAULT_BUCKETS):
+        self.name, self.labels = name, labels or {}
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += seconds
+            self._count += 1
+
+    def time(self):
+        """Context manager / decorator that observes the elapsed wall time."""
+        return _Timer(self)
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def sum(self):
+        return self._sum
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation (coarse)."""
+        if not self._count: return 0.0
+        rank, seen = q * self._count, 0
+        for bound, c in zip(self.buckets + (float("inf"),), self._counts):
+            seen += c
+            if seen >= rank: return bound
+        return float("inf")
+
+    def samples(self):
+        cum = 0
+        for bound, c in zip(self.buckets + (float("inf"),), self._counts):
+            cum += c
+            yield self.name + "_bucket", {**self.labels, "le": _fmt_num(bound)}, cum
+        yield self.name + "_sum", self.labels, self._sum
+        yield self.name + "_count", self.labels, self._count
+
+class _Timer:
+    def __init__(self, hist):
+        self.hist = hist
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self._t0)
+        return False
+
+    def __call__(self, fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Timer(self.hist):
+                return fn(*args, **kwargs)
+        return wrapper
+
+# ------------ Registry ------------
+class Registry:
+    def __init__(self):
+        self._metrics = {}    # (name, labels) -> metric
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help, labels, **kw):
+        key = (name, tuple(sorted(labels.items())))
+        m = self._metrics.get(key)
+        if m is None:
+            with self._lock:
+                m = self._metrics.get(key)
+                if m is None:
+                    m = self._metrics[key] = cls(name, labels, **kw)
+                    self._help.setdefault(name, help)
+        if not isinstance(m, cls) or m.kind != cls.kind:
+            raise ValueError(f"metric {name} already registered as {m.kind}")
+        return m
+
+    def counter(self, name, help="", **labels):
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name, help="", **labels):
+        return self._get(Gauge, name, help, labels)
+
+    def histogram(self, name, help="", buckets=DEFAULT_BUCKETS, **labels):
+        return self._get(Histogram, name, help, labels, buckets=buckets)
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        out, seen = [], set()
+        for (name, _), m in sorted(self._metrics.items(), key=lambda kv: kv[0]):
+            if name not in seen:
+                seen.add(name)
+                if self._help.get(name):
+                    out.append(f"# HELP {name} {self._help[name]}")
+                out.append(f"# TYPE {name} {m.kind}")
+            for sname, labels, value in m.samples():
+                out.append(f"{sname}{_fmt_labels(labels)} {_fmt_num(value)}")
+        return "\n".join(out) + "\n"
+
+    def stats_line(self, *prefixes):
+        """One-line summary of the metrics whose names start with any prefix."""
+        parts = []
+        for (name, _), m in sorted(self._metrics.items(), key=lambda kv: kv[0]):
+            if prefixes and not name.startswith(prefixes): continue
+            label = name + _fmt_labels(m.labels).replace('"', "")
+            if isinstance(m, Histogram):
+                avg = (m.sum / m.count * 1000) if m.count else 0.0
+                parts.append(f"{label}: n={m.count} avg={avg:.2f}ms p95<={m.quantile(0.95) * 1000:g}ms")
+            else:
+                parts.append(f"{label}={_fmt_num(m.value)}")
+        return " | ".join(parts)
+
+REGISTRY = Registry()
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
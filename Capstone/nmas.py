@@ -0,0 +1,163 @@
+# nmas.py
+# ---------------------------------------------------------------------------
+# Network Monitoring & Alert System (NMAS)
+# Capstone Project – Liberty University
+#
+# Copyright (c) 2025 Simon Peter Hemingway. All rights reserved.
+#
+# This code was developed as part of an academic course at Liberty University.
+# It is provided for educational purposes only. Unauthorized use,
+# reproduction, or distribution of this code without express written
+# permission is prohibited.
+# ---------------------------------------------------------------------------
+#
+# Entry point (also the PyInstaller target for nmas.exe):
+#
+#   nmas listener | detect | dashboard | all | forward
+#
+# "all" runs everything in one process: the listener hands parsed events to
+# in-memory queues feeding a batched storage writer and the streaming
+# detector, while the dashboard reads events.db and passes events ingested
+# from edge forwarders to the detector as well. Components are imported
+# lazily so e.g. listener-only startup never loads Flask.
+
+import argparse, queue, signal, threading, time
+
+STATS_PREFIXES = ("nmas_listener", "nmas_writer", "nmas_queue", "nmas_detect", "nmas_notifier", "nmas_forwarder")
+
+class Supervisor:
+    """Runs components in threads and stops them in start order on Ctrl+C/SIGTERM,
+    so upstream producers stop before their consumers drain the queues."""
+
+    def __init__(self):
+        self.stop = threading.Event()
+        self._components = []   # (name, thread, stop_fn)
+
+    def spawn(self, name, target, *args, stop_fn=None):
+        t = threading.Thread(target=self._guard, args=(name, target) + args, name=name, daemon=True)
+        self._components.append((name, t, stop_fn))
+        t.start()
+        return t
+
+    def _guard(self, name, target, *args):
+        try:
+            target(*args)
+        except Exception as e:
+            print(f"[SUPERVISOR] {name} crashed: {e!r}")
+            self.stop.set()
+
+    def wait(self, stats_interval=0):
+        """Block until Ctrl+C, SIGTERM or a crashed component."""
+        from Capstone.metrics.registry import REGISTRY
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: self.stop.set())
+        next_stats = time.monotonic() + stats_interval
+        try:
+            while not self.stop.wait(0.5):
+                if stats_interval and time.monotonic() >= next_stats:
+                    print(f"[STATS] {REGISTRY.stats_line(*STATS_PREFIXES)}")
+                    next_stats = time.monotonic() + stats_interval
+        except KeyboardInterrupt:
+            print("\n[INFO] Shutting down...")
+        self.shutdown()
+
+    def shutdown(self, timeout=10.0):
+        self.stop.set()
+        for name, t, stop_fn in self._components:
+            try:
+                if stop_fn: stop_fn()
+            except Exception as e:
+                print(f"[SUPERVISOR] stopping {name} failed: {e!r}")
+            t.join(timeout)
+            print(f"[SUPERVISOR] {name} {'did not stop in time' if t.is_alive() else 'stopped'}")
+
+# ------------ Modes ------------
+def run_listener(args):
+    from Capstone.ingest.syslog_listener import main
+    main()
+
+def run_detect(args):
+    from Capstone.detect import run_detection
+    if args.loop: run_detection.daemon(args.loop, args.stats_interval)
+    else: run_detection.main()
+
+def run_forward(args):
+    from Capstone.ingest.forwarder import main
+    main()
+
+def run_dashboard(args):
+    from Capstone.dashboard.app import app
+    app.run(host=args.host, port=args.port)
+
+def fan_out(queues):
+    """on_event for the listener: enqueue to every consumer without blocking the socket."""
+    from Capstone.metrics.registry import counter
+    dropped = {name: counter("nmas_queue_dropped_total", "Events dropped on a full queue", queue=name)
+               for name in queues}
+
+    def on_event(*event):
+        for name, q in queues.items():
+            try:
+                q.put_nowait(event)
+            except queue.Full:
+                dropped[name].inc()
+    return on_event
+
+def run_all(args, supervisor=None):
+    from Capstone.ingest import syslog_listener as listener
+    from Capstone.ingest.writer import BatchWriter, STOP
+    from Capstone.detect.stream import run_stream
+    from Capstone.metrics.registry import gauge
+
+    sup = supervisor or Supervisor()
+    listener.ensure_db()
+    cfg = listener.load_config()["listener"]
+
+    queues = {"writer": queue.Queue(args.queue_size), "detect": queue.Queue(args.queue_size)}
+    for name, q in queues.items():
+        gauge("nmas_queue_depth", "Events waiting in an in-process queue", queue=name).set_function(q.qsize)
+    sock = listener.open_socket(cfg["bind_host"], int(cfg["port"]))
+    print(f"[LISTENER] Listening on {cfg['bind_host']}:{cfg['port']}")
+
+    # stop order = spawn order: the producers (listener closes the socket, the dashboard
+    # stops accepting edge batches) go first, then writer/detector drain their queues
+    sup.spawn("listener", listener.receive_loop, sock, fan_out(queues), sup.stop)
+    if not args.no_dashboard:
+        from werkzeug.serving import make_server
+        from Capstone.dashboard.app import app, INGEST_HOOKS
+        # batches forwarded by edges (POST /api/ingest) reach the streaming detector too
+        hook = fan_out({"detect": queues["detect"]})
+        INGEST_HOOKS.append(hook)
+        server = make_server(args.host, args.port, app, threaded=True)
+
+        def stop_dashboard():
+            server.shutdown()
+            INGEST_HOOKS.remove(hook)   # nothing may enqueue behind the detector's STOP
+        print(f"[DASHBOARD] http://{args.host}:{args.port}")
+        sup.spawn("dashboard", server.serve_forever, stop_fn=stop_dashboard)
+    sup.spawn("writer", BatchWriter(queues["writer"], batch_size=args.batch_size).run,
+              stop_fn=lambda: queues["writer"].put(STOP, timeout=10))
+    sup.spawn("detect", run_stream, queues["detect"], None, args.detect_interval,
+              stop_fn=lambda: queues["detect"].put(STOP, timeout=10))
+
+    sup.wait(args.stats_interval)
+    sock.close()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="nmas", description="Network Monitoring & Alert System")
+    ap.add_argument("mode", choices=("listener", "detect", "dashboard", "all", "forward"))
+    ap.add_argument("--host", default="127.0.0.1", help="dashboard bind host")
+    ap.add_argument("--port", type=int, default=5000, help="dashboard port")
+    ap.add_argument("--loop", type=float, help="detect: run a pass every N seconds")
+    ap.add_argument("--detect-interval", type=float, default=30, help="all: seconds between detection passes")
+    ap.add_argument("--batch-size", type=int, default=500, help="all: max rows per storage commit")
+    ap.add_argument("--queue-size", type=int, default=100_000, help="all: per-queue capacity")
+    ap.add_argument("--stats-interval", type=float, default=60, help="all, detect --loop: seconds between [STATS] lines")
+    ap.add_argument("--no-dashboard", action="store_true", help="all: skip the web UI")
+    args = ap.parse_args(argv)
+
+    {"listener": run_listener, "detect": run_detect,
+     "dashboard": run_dashboard, "all": run_all, "forward": run_forward}[args.mode](args)
+
+if __name__ == "__main__":
+    main()
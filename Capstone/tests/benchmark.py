@@ -0,0 +1,225 @@
+# benchmark.py
+# ---------------------------------------------------------------------------
+# Network Monitoring & Alert System (NMAS)
+# Capstone Project – Liberty University
+#
+# Copyright (c) 2025 Simon Peter Hemingway. All rights reserved.
+#
+# This code was developed as part of an academic course at Liberty University.
+# It is provided for educational purposes only. Unauthorized use,
+# reproduction, or distribution of this code without express written
+# permission is prohibited.
+# ---------------------------------------------------------------------------
+#
+# Reproducible performance benchmarks. Every dataset is built on a temporary
+# database (never events.db) from a fixed random seed.
+#
+#   python -m Capstone.tests.benchmark                         # 10^4 .. 10^7 rows
+#   python -m Capstone.tests.benchmark --sizes 10000,100000 --out bench.json
+#   python -m Capstone.tests.benchmark --baseline bench.json   # exit 1 on regression
+
+import argparse, contextlib, io, json, os, platform, random, sqlite3, statistics, sys, tempfile, time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from Capstone.ingest import syslog_listener as listener
+from Capstone.detect import run_detection as detection
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000, 10_000_000)
+SEED = 484
+N_SOURCES = 5000
+N_USERS = 200
+WINDOW_HOURS = 24
+
+def iso(dt):
+    return dt.isoformat(timespec="seconds")
+
+# ------------ Dataset ------------
+def generate_rows(n, now, seed=SEED):
+    """Yield n (ts, source, message, username, port) rows spread over the last 24h.
+    Roughly 70% noise, 20% failed logins, 10% connection attempts."""
+    rnd = random.Random(seed)
+    span = WINDOW_HOURS * 3600
+    for _ in range(n):
+        ts = iso(now - timedelta(seconds=rnd.randrange(span)))
+        i = rnd.randrange(N_SOURCES)
+        src = f"10.{i // 250}.{i % 250}.7"
+        r = rnd.random()
+        if r < 0.20:
+            user = f"user{rnd.randrange(N_USERS)}"
+            yield ts, src, f"sshd[22]: Failed password for {user} from {src}", user, None
+        elif r < 0.30:
+            port = str(rnd.randrange(1, 65536))
+            yield ts, src, f"kernel: DROP SRC={src} DPT={port}", None, port
+        else:
+            yield ts, src, f"systemd[1]: Started session {rnd.randrange(10**6)}", None, None
+
+def generate_alerts(n, now, seed=SEED):
+    rnd = random.Random(seed + 1)
+    for i in range(n):
+        ts = now - timedelta(seconds=rnd.randrange(WINDOW_HOURS * 3600))
+        kind = "FAILED_LOGIN_BURST" if rnd.random() < 0.5 else "PORT_SCAN"
+        yield (iso(ts), kind, f"10.0.{i // 250 % 250}.{i % 250}",
+               "admin" if kind == "FAILED_LOGIN_BURST" else None,
+               iso(ts - timedelta(seconds=60)), iso(ts), rnd.randrange(5, 60), f"bench alert {i}")
+
+def build_db(path, rows, now):
+    """Create the listener schema on a fresh DB and bulk-load `rows` log lines
+    plus rows/100 alerts for the dashboard."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        listener.ensure_db(path)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    detection.ensure_alerts(conn)
+    conn.executemany(listener.INSERT_LOG, generate_rows(rows, now))
+    conn.executemany(
+        "INSERT OR IGNORE INTO alerts (ts, type, source, username, window_start, window_end, count, details) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        generate_alerts(max(1, rows // 100), now),
+    )
+    conn.commit()
+    conn.close()
+
+# ------------ Measurements ------------
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return samples
+
+def summarize(name, rows, samples, unit="ms", higher_is_better=False):
+    return {
+        "name": name, "rows": rows, "unit": unit, "higher_is_better": higher_is_better,
+        "median": statistics.median(samples), "min": min(samples),
+        "mean": statistics.fmean(samples), "samples": len(samples),
+    }
+
+def bench_listener(path, rows, inserts, repeat):
+    """Events/sec through parse_fields + store_event (the per-packet listener path)."""
+    rnd = random.Random(SEED + 2)
+    msgs = [f"sshd[22]: Failed password for user{rnd.randrange(N_USERS)} port {rnd.randrange(1, 65536)}"
+            for _ in range(inserts)]
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for m in msgs:
+            username, port = listener.parse_fields(m)
+            listener.store_event(iso(datetime.now()), "192.0.2.1", m, username, port, db_path=path)
+        samples.append(inserts / (time.perf_counter() - t0))
+    return summarize("listener_insert", rows, samples, unit="events/s", higher_is_better=True)
+
+def bench_detection(path, rows, now, repeat):
+    conn = sqlite3.connect(path)
+    try:
+        return [
+            summarize("detect_failed_login_bursts", rows,
+                      timed(lambda: detection.detect_failed_login_bursts(conn, now), repeat)),
+            summarize("detect_port_scans", rows,
+                      timed(lambda: detection.detect_port_scans(conn, now), repeat)),
+        ]
+    finally:
+        conn.close()
+
+def bench_dashboard(path, rows, repeat):
+    from Capstone.dashboard import app as dashboard   # Flask only needed here
+    import base64
+    saved = dashboard.DB_PATH
+    dashboard.DB_PATH = Path(path)
+    auth = dashboard.CONFIG["auth"]
+    token = base64.b64encode(f"{auth['username']}:{auth['password']}".encode()).decode()
+    headers = {"Authorization": f"Basic {token}"}
+    client = dashboard.app.test_client()
+
+    def get(url):
+        resp = client.get(url, headers=headers)
+        resp.get_data()                    # drain streamed bodies (CSV)
+        assert resp.status_code == 200, (url, resp.status_code)
+
+    try:
+        # the first index load builds the top-sources cache from the whole window
+        cold = timed(lambda: get("/?hours=24"), 1)
+        return [
+            summarize("dashboard_index_cold", rows, cold),
+            summarize("dashboard_index", rows, timed(lambda: get("/?hours=24"), repeat)),
+            summarize("dashboard_export_csv", rows, timed(lambda: get("/export.csv?hours=24"), repeat)),
+            summarize("dashboard_log_search", rows,
+                      timed(lambda: get("/api/logs?q=%22Failed+password%22+user7&hours=24"), repeat)),
+        ]
+    finally:
+        dashboard.DB_PATH = saved
+
+def run(sizes, repeat=5, inserts=2000, workdir=None):
+    results = []
+    for n in sizes:
+        with tempfile.TemporaryDirectory(dir=workdir, prefix="nmas_bench_") as tmp:
+            path = os.path.join(tmp, "events.db")
+            now = datetime.utcnow().replace(microsecond=0)
+            t0 = time.perf_counter()
+            build_db(path, n, now)
+            build = time.perf_counter() - t0
+            print(f"[BENCH] {n:>10,} rows built in {build:.1f}s", file=sys.stderr)
+            results.append(summarize("build_dataset", n, [build * 1000.0]))
+            results.extend(bench_detection(path, n, now, repeat))
+            results.extend(bench_dashboard(path, n, repeat))
+            results.append(bench_listener(path, n, inserts, max(1, repeat // 2)))
+    return {
+        "meta": {
+            "created": iso(datetime.utcnow()),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": SEED, "repeat": repeat, "listener_inserts": inserts,
+        },
+        "results": results,
+    }
+
+# ------------ Baseline comparison ------------
+def compare(current, baseline, tolerance=0.25):
+    """Return metrics whose median moved more than `tolerance` in the wrong direction."""
+    base = {(r["name"], r["rows"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in current.get("results", []):
+        b = base.get((r["name"], r["rows"]))
+        if not b or not b["median"] or r["name"] == "build_dataset":
+            continue
+        ratio = r["median"] / b["median"]
+        worse = ratio < 1 / (1 + tolerance) if r["higher_is_better"] else ratio > 1 + tolerance
+        if worse:
+            regressions.append({"name": r["name"], "rows": r["rows"], "unit": r["unit"],
+                                "baseline": b["median"], "current": r["median"], "ratio": ratio})
+    return regressions
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="NMAS performance benchmarks")
+    ap.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                    help="comma-separated log row counts (default: 10^4..10^7)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--inserts", type=int, default=2000, help="packets per listener throughput sample")
+    ap.add_argument("--out", help="write JSON results here (default: stdout)")
+    ap.add_argument("--baseline", help="JSON results from a previous run to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    ap.add_argument("--workdir", help="directory for temporary databases")
+    args = ap.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    report = run(sizes, repeat=args.repeat, inserts=args.inserts, workdir=args.workdir)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        report["regressions"] = compare(report, baseline, args.tolerance)
+        for r in report["regressions"]:
+            print(f"[REGRESSION] {r['name']} @ {r['rows']:,} rows: "
+                  f"{r['baseline']:.2f} -> {r['current']:.2f} {r['unit']}", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+    else:
+        print(text)
+    return 1 if report.get("regressions") else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+# conftest.py
+# ---------------------------------------------------------------------------
+# Network Monitoring & Alert System (NMAS)
+# Capstone Project – Liberty University
+#
+# Copyright (c) 2025 Simon Peter Hemingway. All rights reserved.
+#
+# This code was developed as part of an academic course at Liberty University.
+# It is provided for educational purposes only. Unauthorized use,
+# reproduction, or distribution of this code without express written
+# permission is prohibited.
+# ---------------------------------------------------------------------------
+
+import base64
+from pathlib import Path
+import pytest
+
+@pytest.fixture
+def dashboard_client(monkeypatch):
+    """Factory: point the dashboard at db_path (restored after the test) and
+    return a Flask test client that sends the configured Basic auth."""
+    from Capstone.dashboard import app as dashboard   # Flask only for tests that use it
+
+    def make(db_path):
+        monkeypatch.setattr(dashboard, "DB_PATH", Path(db_path))
+        auth = dashboard.CONFIG["auth"]
+        token = base64.b64encode(f"{auth['username']}:{auth['password']}".encode()).decode()
+        client = dashboard.app.test_client()
+        client.environ_base["HTTP_AUTHORIZATION"] = f"Basic {token}"
+        return client
+    return make
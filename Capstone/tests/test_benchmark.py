@@ -0,0 +1,40 @@
+#test_benchmark.py
+# ---------------------------------------------------------------------------
+# Network Monitoring & Alert System (NMAS)
+# Capstone Project – Liberty University
+#
+# Copyright (c) 2025 Simon Peter Hemingway. All rights reserved.
+#
+# This code was developed as part of an academic course at Liberty University.
+# It is provided for educational purposes only. Unauthorized use,
+# reproduction, or distribution of this code without express written
+# permission is prohibited.
+# ---------------------------------------------------------------------------
+
+from Capstone.tests.benchmark import run, compare
+
+def test_benchmark_smoke(tmp_path):
+    from Capstone.dashboard import app as dashboard
+    db_path = dashboard.DB_PATH
+    report = run([1000], repeat=1, inserts=20, workdir=str(tmp_path))
+    names = {r["name"] for r in report["results"]}
+    assert {"listener_insert", "detect_failed_login_bursts", "detect_port_scans",
+            "dashboard_index_cold", "dashboard_index", "dashboard_export_csv", "dashboard_log_search"} <= names
+    assert all(r["rows"] == 1000 and r["median"] > 0 for r in report["results"])
+    # temporary databases are cleaned up and the dashboard points back at its own
+    assert list(tmp_path.iterdir()) == [] and dashboard.DB_PATH == db_path
+
+def test_compare_flags_regressions():
+    base = {"results": [
+        {"name": "detect_port_scans", "rows": 10, "unit": "ms", "higher_is_better": False, "median": 10.0},
+        {"name": "listener_insert", "rows": 10, "unit": "events/s", "higher_is_better": True, "median": 1000.0},
+    ]}
+    same = {"results": [dict(r) for r in base["results"]]}
+    assert compare(same, base) == []
+
+    worse = {"results": [
+        {**base["results"][0], "median": 20.0},
+        {**base["results"][1], "median": 500.0},
+    ]}
+    flagged = {r["name"] for r in compare(worse, base, tolerance=0.25)}
+    assert flagged == {"detect_port_scans", "listener_insert"}
@@ -11,9 +11,11 @@
 # permission is prohibited.
 # ---------------------------------------------------------------------------
 
-import os, sqlite3, sys
+import sqlite3, sys
+import pytest
 from datetime import datetime, timedelta
-from detect.run_detection import detect_failed_login_bursts, detect_port_scans
+from pathlib import Path
+from Capstone.detect.run_detection import detect_failed_login_bursts, detect_port_scans
 
 #exe path
 
@@ -23,11 +25,11 @@ def app_root() -> Path:
         return Path(sys.executable).resolve().parent
     return Path(__file__).resolve().parents[1]
 
-DB = "events_test.db"
-
-def setup_module(_):
-    if os.path.exists(DB): os.remove(DB)
-    conn = sqlite3.connect(DB)
+# keep the test DB out of the working directory
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    path = tmp_path_factory.mktemp("detection") / "events.db"
+    conn = sqlite3.connect(path)
     conn.execute("""
         CREATE TABLE logs (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -46,9 +48,10 @@ def setup_module(_):
         )
     """)
     conn.close()
+    return path
 
-def test_failed_login_detection():
-    conn = sqlite3.connect(DB)
+def test_failed_login_detection(db):
+    conn = sqlite3.connect(db)
     now = datetime.utcnow()
     iso = lambda dt: dt.isoformat(timespec="seconds")
 
@@ -68,8 +71,8 @@ def test_failed_login_detection():
     assert alerts[0]["username"] == "admin"
     assert alerts[0]["count"] >= 5
 
-def test_port_scan_detection():
-    conn = sqlite3.connect(DB)
+def test_port_scan_detection(db):
+    conn = sqlite3.connect(db)
     now = datetime.utcnow()
     iso = lambda dt: dt.isoformat(timespec="seconds")
 
@@ -0,0 +1,225 @@
+#test_forwarder.py
+# ---------------------------------------------------------------------------
+# Network Monitoring & Alert System (NMAS)
+# Capstone Project – Liberty University
+#
+# Copyright (c) 2025 Simon Peter Hemingway. All rights reserved.
+#
+# This code was developed as part of an academic course at Liberty University.
+# It is provided for educational purposes only. Unauthorized use,
+# reproduction, or distribution of this code without express written
+# permission is prohibited.
+# ---------------------------------------------------------------------------
+
+import argparse, gzip, json, queue, socket, sqlite3, threading, time, urllib.error, urllib.request
+from datetime import datetime
+import pytest
+from werkzeug.serving import make_server
+from Capstone.dashboard import app as dashboard
+from Capstone.ingest import syslog_listener as listener
+from Capstone.ingest.forwarder import Spool, Forwarder, BYTES_OUT
+from Capstone.detect.stream import StreamingDetector
+from Capstone.nmas import Supervisor, fan_out
+
+@pytest.fixture
+def central(tmp_path, dashboard_client):
+    """Aggregator (dashboard app) on an ephemeral localhost port with its own events.db,
+    plus an authenticated test client for it."""
+    client = dashboard_client(tmp_path / "central.db")
+    server = make_server("127.0.0.1", 0, dashboard.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/api/ingest", dashboard.DB_PATH, client
+    server.shutdown()
+
+def forwarder(spool, url, **kw):
+    auth = dashboard.CONFIG["auth"]
+    return Forwarder(spool, url, "edge-1", auth["username"], auth["password"], **kw)
+
+def spool_events(spool, n, start=0):
+    ts = datetime.utcnow().isoformat(timespec="seconds")
+    for i in range(start, start + n):
+        spool.append(ts, "10.1.0.5", f"sshd[9]: Failed password for user{i % 7} port {i}", f"user{i % 7}", str(i))
+
+def count_logs(db):
+    conn = sqlite3.connect(db)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0        # nothing ingested yet
+    finally:
+        conn.close()
+
+def test_batches_compressed_acked_and_searchable(tmp_path, central):
+    url, db, _ = central
+    spool = Spool(tmp_path / "spool.db")
+    spool_events(spool, 1200)
+    fwd = forwarder(spool, url, batch_size=500)
+    sent_before = BYTES_OUT.value
+
+    assert [fwd.ship_once() for _ in range(4)] == [500, 500, 200, 0]
+    assert spool.size() == 0 and count_logs(db) == 1200
+    raw = sum(len(f"sshd[9]: Failed password for user{i % 7} port {i}") for i in range(1200))
+    assert BYTES_OUT.value - sent_before < raw / 3      # gzip'd batches, well under raw message bytes
+
+    conn = sqlite3.connect(db)
+    conn.row_factory = sqlite3.Row
+    rows, _ = dashboard.search_logs(conn, q='"Failed password" user3', limit=1000)
+    conn.close()
+    assert len(rows) == len([i for i in range(1200) if i % 7 == 3])
+
+def test_outage_keeps_spool_and_resumes(tmp_path, central):
+    url, db, _ = central
+    spool = Spool(tmp_path / "spool.db")
+    spool_events(spool, 300)
+
+    s = socket.socket()
+    s.bind(("127.0.0.1", 0))
+    dead = f"http://127.0.0.1:{s.getsockname()[1]}/api/ingest"
+    s.close()
+    with pytest.raises(urllib.error.URLError):
+        forwarder(spool, dead, batch_size=100).ship_once()
+    assert spool.size() == 300
+
+    # restart of the edge process: same spool file, central back up
+    spool.close()
+    spool = Spool(tmp_path / "spool.db")
+    fwd = forwarder(spool, url, batch_size=100)
+    while fwd.ship_once():
+        pass
+    assert spool.size() == 0 and count_logs(db) == 300
+
+def test_resent_batch_is_not_duplicated(tmp_path, central):
+    url, db, client = central
+    spool = Spool(tmp_path / "spool.db")
+    spool_events(spool, 50)
+    rows = [list(r) for r in spool.peek(50)]
+    body = gzip.compress(json.dumps({"edge": "edge-1", "spool": spool.spool_id, "events": rows}).encode())
+    headers = {"Content-Encoding": "gzip"}
+
+    first = client.post("/api/ingest", data=body, headers=headers).get_json()
+    again = client.post("/api/ingest", data=body, headers=headers).get_json()   # ack was lost
+    assert first == {"ok": True, "acked": rows[-1][0], "inserted": 50}
+    assert again == {"ok": True, "acked": rows[-1][0], "inserted": 0}
+    assert count_logs(db) == 50
+
+    assert client.post("/api/ingest", data=b"junk", headers=headers).status_code == 400
+    assert dashboard.app.test_client().post("/api/ingest", data=body, headers=headers).status_code == 401
+
+def test_concurrent_resends_are_not_duplicated(tmp_path, central):
+    # the forwarder timed out and re-sent while central was still committing the first copy
+    url, db, _ = central
+    spool = Spool(tmp_path / "spool.db")
+    spool_events(spool, 3000)
+    rows = [list(r) for r in spool.peek(3000)]
+    body = gzip.compress(json.dumps({"edge": "edge-1", "spool": spool.spool_id, "events": rows}).encode())
+    headers = forwarder(spool, url).headers
+    start, results = threading.Barrier(4), []
+
+    def post():
+        start.wait()
+        req = urllib.request.Request(url, data=body, headers=headers, method="POST")
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            results.append(json.loads(resp.read()))
+    threads = [threading.Thread(target=post) for _ in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert sorted(r["inserted"] for r in results) == [0, 0, 0, 3000]
+    assert {r["acked"] for r in results} == {rows[-1][0]} and count_logs(db) == 3000
+
+def test_ingested_events_reach_streaming_detector(tmp_path, central, monkeypatch):
+    # what "nmas all" wires up: fresh ingested events -> detect queue -> StreamingDetector
+    url, db, client = central
+    q = queue.Queue()
+    monkeypatch.setattr(dashboard, "INGEST_HOOKS", [fan_out({"detect": q})])
+    spool = Spool(tmp_path / "spool.db")
+    spool_events(spool, 20)
+    body = gzip.compress(json.dumps({"edge": "edge-1", "spool": spool.spool_id,
+                                     "events": [list(r) for r in spool.peek(20)]}).encode())
+    for _ in range(2):      # the re-sent batch is not observed twice
+        client.post("/api/ingest", data=body, headers={"Content-Encoding": "gzip"})
+    assert q.qsize() == 20
+
+    det = StreamingDetector()
+    while not q.empty():
+        det.observe(*q.get())
+    alerts = det.evaluate(datetime.utcnow().replace(microsecond=0))
+    assert [(a["type"], a["source"], a["count"]) for a in alerts] == [("PORT_SCAN", "10.1.0.5", 20)]
+
+@pytest.mark.parametrize("event", [
+    {"seq": 1}, [1, "2025-01-01T00:00:00"], ["1", "2025-01-01T00:00:00", "h", "m", None, None],
+    [1, "yesterday", "h", "m", None, None], [1, "2025-01-01T00:00:00", "h", None, None, None],
+    [1, "2025-01-01T00:00:00+00:00", "h", "m", None, None], [True, "2025-01-01T00:00:00", "h", "m", None, None],
+])
+def test_malformed_events_rejected(tmp_path, central, event):
+    url, db, client = central
+    body = json.dumps({"edge": "edge-1", "spool": "s", "events": [event]})
+    resp = client.post("/api/ingest", data=body)
+    assert resp.status_code == 400 and "events must be" in resp.get_json()["error"]
+    assert count_logs(db) == 0
+
+def test_listener_to_central_on_localhost(tmp_path, central):
+    url, db, _ = central
+    spool = Spool(tmp_path / "spool.db")
+    sup = Supervisor()
+    sock = listener.open_socket("127.0.0.1", 0)
+    sup.spawn("listener", listener.receive_loop, sock, spool.append, sup.stop)
+    sup.spawn("forwarder", forwarder(spool, url, batch_size=64, interval_sec=0.05).run, sup.stop)
+
+    out = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    for p in range(200):
+        out.sendto(f"kernel: DROP SRC=10.9.9.9 DPT={p}".encode(), sock.getsockname())
+    out.close()
+    deadline = time.monotonic() + 10
+    while count_logs(db) < 200 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    sup.shutdown()
+    sock.close()
+    assert count_logs(db) == 200 and spool.size() == 0
+
+class RecordingSupervisor(Supervisor):
+    """Shuts down as soon as run_all waits, recording the stop order and whether
+    the dashboard's ingest hook was still registered when each component stopped."""
+    def __init__(self):
+        super().__init__()
+        self.stopped = []
+    def wait(self, stats_interval=0):
+        self._components = [(name, t, self._record(name, stop_fn)) for name, t, stop_fn in self._components]
+        self.shutdown()
+    def _record(self, name, stop_fn):
+        def stop():
+            if stop_fn: stop_fn()
+            self.stopped.append((name, len(dashboard.INGEST_HOOKS)))
+        return stop
+
+def test_all_mode_stops_dashboard_before_detector(tmp_path, monkeypatch, dashboard_client):
+    from Capstone.detect import run_detection as rd
+    from Capstone.ingest import writer
+    from Capstone import nmas
+    db = tmp_path / "events.db"
+    dashboard_client(db)
+    for module, name in ((listener, "DB_PATH"), (writer, "DB_PATH"), (rd, "DB")):
+        monkeypatch.setattr(module, name, db)
+    monkeypatch.setattr(listener, "load_config", lambda: {"listener": {"bind_host": "127.0.0.1", "port": 0}})
+    hooks = len(dashboard.INGEST_HOOKS)
+
+    sup = RecordingSupervisor()
+    nmas.run_all(argparse.Namespace(
+        host="127.0.0.1", port=0, detect_interval=3600, batch_size=500, queue_size=100,
+        stats_interval=0, no_dashboard=False), sup)
+    # no edge batch can be queued for the detector after its STOP
+    assert sup.stopped == [("listener", hooks + 1), ("dashboard", hooks), ("writer", hooks), ("detect", hooks)]
+
+def test_forward_mode_prints_forwarder_stats(tmp_path, monkeypatch, capsys):
+    from Capstone.ingest import forwarder as fwd_module
+    from Capstone import nmas
+    cfg = {**fwd_module.DEFAULTS, "spool_path": str(tmp_path / "spool.db"), "stats_interval_sec": 0.2}
+    monkeypatch.setattr(fwd_module, "load_config", lambda: cfg)
+    monkeypatch.setattr(listener, "load_config", lambda: {"listener": {"bind_host": "127.0.0.1", "port": 0}})
+    monkeypatch.setattr(nmas.signal, "signal", lambda *a: None)    # keep pytest's SIGTERM handler
+
+    sup = Supervisor()
+    threading.Timer(1.2, sup.stop.set).start()
+    fwd_module.main(sup)
+    # the edge has no /metrics: its forwarder metrics reach the console instead
+    stats = [l for l in capsys.readouterr().out.splitlines() if l.startswith("[STATS]")]
+    assert stats and "nmas_forwarder_events_spooled_total" in stats[0]
@@ -0,0 +1,130 @@
+#test_log_search.py
+# ---------------------------------------------------------------------------
+# Network Monitoring & Alert System (NMAS)
+# Capstone Project – Liberty University
+#
+# Copyright (c) 2025 Simon Peter Hemingway. All rights reserved.
+#
+# This code was developed as part of an academic course at Liberty University.
+# It is provided for educational purposes only. Unauthorized use,
+# reproduction, or distribution of this code without express written
+# permission is prohibited.
+# ---------------------------------------------------------------------------
+
+import contextlib, io, sqlite3
+from datetime import datetime, timedelta
+from Capstone.dashboard import app as dashboard
+from Capstone.ingest import syslog_listener as listener
+
+NOW = datetime.utcnow().replace(microsecond=0)
+iso = lambda dt: dt.isoformat(timespec="seconds")
+
+def make_db(path, rows):
+    """Half the rows exist before ensure_db() creates the index (rebuild path),
+    the rest go through the insert trigger."""
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE logs (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, "
+                 "source TEXT, message TEXT, username TEXT, port TEXT)")
+    conn.executemany(listener.INSERT_LOG, rows[: len(rows) // 2])
+    conn.commit()
+    conn.close()
+    with contextlib.redirect_stdout(io.StringIO()):
+        listener.ensure_db(path)
+    conn = sqlite3.connect(path)
+    conn.executemany(listener.INSERT_LOG, rows[len(rows) // 2:])
+    conn.commit()
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def sample_rows():
+    rows = []
+    for i in range(250):
+        ts = iso(NOW - timedelta(seconds=i))
+        if i % 5 == 0:
+            rows.append((ts, "10.0.0.50", f"sshd[1]: Failed password for admin from 10.0.0.50 port {i}", "admin", str(i)))
+        elif i % 5 == 1:
+            rows.append((ts, "10.0.0.51", "sshd[1]: Failed password for invalid user oracle", "oracle", None))
+        else:
+            rows.append((ts, "10.0.0.99", f"kernel: DROP SRC=10.0.0.99 DPT={i} connection-refused", None, str(i)))
+    return rows
+
+def test_fts_query_sanitizes_input():
+    assert dashboard.fts_query('"Failed password" admin') == '"Failed password" "admin"'
+    assert dashboard.fts_query("conn* OR -x") == '"conn"* "OR" "-x"'
+    assert dashboard.fts_query('unbalanced "quote') == '"unbalanced" """quote"'
+    assert dashboard.fts_query("   ") == ""
+
+def test_search_phrase_filters_and_keyset_pages(tmp_path):
+    conn = make_db(tmp_path / "events.db", sample_rows())
+
+    rows, _ = dashboard.search_logs(conn, q='"Failed password" admin', limit=1000)
+    assert len(rows) == 50 and all(r["source"] == "10.0.0.50" for r in rows)
+    rows, _ = dashboard.search_logs(conn, q="oracle", source="10.0.0.50")
+    assert rows == []
+    rows, _ = dashboard.search_logs(conn, q="connection-refused", limit=1000)
+    assert len(rows) == 150
+    rows, _ = dashboard.search_logs(conn, q="orac*", limit=1000)
+    assert len(rows) == 50
+
+    since, until = iso(NOW - timedelta(seconds=19)), iso(NOW - timedelta(seconds=10))
+    rows, _ = dashboard.search_logs(conn, q="Failed", since=since, until=until)
+    assert sorted(r["timestamp"] for r in rows) == sorted(
+        iso(NOW - timedelta(seconds=i)) for i in range(10, 20) if i % 5 in (0, 1))
+
+    seen, before = [], None
+    while True:
+        page, before = dashboard.search_logs(conn, q="sshd", before=before, limit=7)
+        seen += [r["id"] for r in page]
+        if before is None: break
+    assert seen == sorted(seen, reverse=True) and len(seen) == len(set(seen)) == 100
+
+    # no query: plain newest-first listing with the same paging
+    page, before = dashboard.search_logs(conn, source="10.0.0.99", limit=100)
+    page2, _ = dashboard.search_logs(conn, source="10.0.0.99", before=before, limit=100)
+    assert len(page) + len(page2) == 150 and page[-1]["id"] > page2[0]["id"]
+    conn.close()
+
+def test_index_tracks_deletes(tmp_path):
+    conn = make_db(tmp_path / "events.db", sample_rows())
+    conn.execute("DELETE FROM logs WHERE username = 'oracle'")
+    conn.commit()
+    assert dashboard.search_logs(conn, q="oracle")[0] == []
+    conn.execute("INSERT INTO logs_fts(logs_fts) VALUES ('integrity-check')")
+    conn.close()
+
+def test_logs_page_api_and_alert_links(tmp_path, dashboard_client):
+    db = tmp_path / "events.db"
+    make_db(db, sample_rows()).close()
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE alerts (id INTEGER PRIMARY KEY AUTOINCREMENT, ts TEXT, type TEXT, source TEXT, "
+                 "username TEXT, window_start TEXT, window_end TEXT, count INTEGER, details TEXT)")
+    conn.execute("INSERT INTO alerts (ts, type, source, username, window_start, window_end, count, details) "
+                 "VALUES (?,?,?,?,?,?,?,?)", (iso(NOW), "FAILED_LOGIN_BURST", "10.0.0.50", "admin",
+                                              iso(NOW - timedelta(seconds=180)), iso(NOW), 36, "x"))
+    conn.commit()
+    conn.close()
+
+    client = dashboard_client(db)
+
+    data = client.get("/api/logs?q=admin&limit=20").get_json()
+    assert len(data["rows"]) == 20 and data["next_before"] == data["rows"][-1]["id"]
+    more = client.get(f"/api/logs?q=admin&limit=20&before={data['next_before']}").get_json()
+    assert more["rows"][0]["id"] < data["next_before"]
+
+    index = client.get("/").get_data(as_text=True)
+    assert "/logs?source=10.0.0.50" in index
+    page = client.get("/logs?q=%22Failed+password%22+%22admin%22&source=10.0.0.50")
+    assert page.status_code == 200 and "Failed password for admin" in page.get_data(as_text=True)
+
+def test_fts_checked_once_per_database(tmp_path, monkeypatch):
+    conn = make_db(tmp_path / "events.db", sample_rows())
+    calls = []
+    monkeypatch.setattr(dashboard, "ensure_db", lambda path: calls.append(path) or listener.ensure_db(path))
+    statements = []
+    conn.set_trace_callback(statements.append)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(3):
+            assert len(dashboard.search_logs(conn, q="oracle", limit=1000)[0]) == 50
+    conn.close()
+    assert len(calls) == 1
+    assert not any(s.lstrip().upper().startswith(("CREATE", "COMMIT", "BEGIN")) for s in statements)
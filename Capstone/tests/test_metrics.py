@@ -0,0 +1,82 @@
+#test_metrics.py
+# ---------------------------------------------------------------------------
+# Network Monitoring & Alert System (NMAS)
+# Capstone Project – Liberty University
+#
+# Copyright (c) 2025 Simon Peter Hemingway. All rights reserved.
+#
+# This code was developed as part of an academic course at Liberty University.
+# It is provided for educational purposes only. Unauthorized use,
+# reproduction, or distribution of this code without express written
+# permission is prohibited.
+# ---------------------------------------------------------------------------
+
+import sqlite3
+from datetime import datetime
+from Capstone.metrics.registry import Registry
+
+def test_registry_render_and_stats():
+    reg = Registry()
+    reg.counter("x_total", "things", kind="a").inc(3)
+    reg.gauge("y", "level").set(7)
+    h = reg.histogram("z_seconds", "latency", buckets=(0.01, 0.1))
+    for v in (0.005, 0.05, 0.5):
+        h.observe(v)
+
+    text = reg.render()
+    assert "# TYPE x_total counter" in text
+    assert 'x_total{kind="a"} 3' in text
+    assert "y 7" in text
+    assert 'z_seconds_bucket{le="0.01"} 1' in text
+    assert 'z_seconds_bucket{le="0.1"} 2' in text
+    assert 'z_seconds_bucket{le="+Inf"} 3' in text
+    assert "z_seconds_count 3" in text
+    assert h.quantile(0.5) == 0.1
+
+    line = reg.stats_line("x_", "z_")
+    assert "x_total{kind=a}=3" in line and "z_seconds: n=3" in line and "y=" not in line
+
+def test_timer_decorator_and_same_metric_returned():
+    reg = Registry()
+    h = reg.histogram("f_seconds")
+    assert reg.histogram("f_seconds") is h
+
+    @h.time()
+    def f(): return 42
+    assert f() == 42 and h.count == 1
+
+def test_detection_and_metrics_route(tmp_path, dashboard_client):
+    from Capstone.detect.run_detection import detect_port_scans, upsert_alerts, ensure_alerts
+    from Capstone.dashboard import app as dashboard
+
+    db = tmp_path / "events.db"
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE logs (id INTEGER PRIMARY KEY, timestamp TEXT, source TEXT, "
+                 "message TEXT, username TEXT, port TEXT)")
+    ensure_alerts(conn)
+    now = datetime.utcnow().replace(microsecond=0)
+    conn.executemany("INSERT INTO logs (timestamp, source, message, port) VALUES (?,?,?,?)",
+                     [(now.isoformat(), "5.6.7.8", f"port {p}", str(p)) for p in range(100, 115)])
+    upsert_alerts(conn, detect_port_scans(conn, now))
+    conn.close()
+
+    client = dashboard_client(db)
+    assert dashboard.app.test_client().get("/metrics").status_code == 401
+    resp = client.get("/metrics")
+    body = resp.get_data(as_text=True)
+    assert resp.status_code == 200 and resp.mimetype == "text/plain"
+    assert 'nmas_detect_detector_seconds_count{detector="port_scan"}' in body
+    assert "nmas_detect_upsert_seconds_count" in body
+    assert 'nmas_dashboard_request_seconds_count{endpoint="metrics"}' in body
+
+def test_daemon_survives_failed_pass(monkeypatch):
+    from Capstone.detect import run_detection as rd
+    calls = []
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1: raise sqlite3.OperationalError("database is locked")
+        raise KeyboardInterrupt
+    monkeypatch.setattr(rd, "main", flaky)
+    before = rd.PASS_FAILURES.value
+    rd.daemon(0, 0)
+    assert len(calls) == 2 and rd.PASS_FAILURES.value == before + 1
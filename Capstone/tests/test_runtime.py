@@ -0,0 +1,146 @@
+#test_runtime.py
+# ---------------------------------------------------------------------------
+# Network Monitoring & Alert System (NMAS)
+# Capstone Project – Liberty University
+#
+# Copyright (c) 2025 Simon Peter Hemingway. All rights reserved.
+#
+# This code was developed as part of an academic course at Liberty University.
+# It is provided for educational purposes only. Unauthorized use,
+# reproduction, or distribution of this code without express written
+# permission is prohibited.
+# ---------------------------------------------------------------------------
+
+import contextlib, io, queue, socket, sqlite3, subprocess, sys, threading, time
+from datetime import datetime, timedelta
+from pathlib import Path
+from Capstone.detect.run_detection import detect_failed_login_bursts, detect_port_scans, ensure_alerts
+from Capstone.detect.stream import StreamingDetector, run_stream
+from Capstone.ingest import syslog_listener as listener
+from Capstone.ingest.writer import BatchWriter, STOP
+from Capstone.nmas import Supervisor, fan_out
+
+ROOT = Path(__file__).resolve().parents[2]
+
+def make_db(path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        listener.ensure_db(path)
+    conn = sqlite3.connect(path)
+    ensure_alerts(conn)
+    return conn
+
+def test_streaming_detector_matches_sql(tmp_path):
+    now = datetime.utcnow().replace(microsecond=0)
+    iso = lambda dt: dt.isoformat(timespec="seconds")
+    events = []
+    for i in range(6):    # burst inside the 3 min window
+        events.append((iso(now - timedelta(seconds=100 - i * 10)), "1.2.3.4", "Failed password for admin", "admin", None))
+    for i in range(4):    # too few to alert
+        events.append((iso(now - timedelta(seconds=30)), "1.2.3.5", "Failed password for root", "root", None))
+    for i in range(8):    # old, outside the window
+        events.append((iso(now - timedelta(seconds=600)), "1.2.3.6", "Failed password for bob", "bob", None))
+    for p in range(20, 35):
+        events.append((iso(now - timedelta(seconds=20)), "5.6.7.8", f"port {p}", None, str(p)))
+    for p in range(20, 35):   # outside the 60s window
+        events.append((iso(now - timedelta(seconds=300)), "5.6.7.9", f"port {p}", None, str(p)))
+
+    conn = make_db(tmp_path / "events.db")
+    conn.executemany(listener.INSERT_LOG, events)
+    conn.commit()
+    expected = detect_failed_login_bursts(conn, now) + detect_port_scans(conn, now)
+    conn.close()
+
+    det = StreamingDetector()
+    for ev in events:
+        det.observe(*ev)
+    assert sorted(det.evaluate(now), key=str) == sorted(expected, key=str)
+    assert len(expected) == 2
+
+def test_all_mode_pipeline_drains_on_shutdown(tmp_path):
+    db = tmp_path / "events.db"
+    make_db(db).close()
+
+    sup = Supervisor()
+    queues = {"writer": queue.Queue(), "detect": queue.Queue()}
+    sock = listener.open_socket("127.0.0.1", 0)
+    sup.spawn("listener", listener.receive_loop, sock, fan_out(queues), sup.stop)
+    sup.spawn("writer", BatchWriter(queues["writer"], db_path=db, batch_size=7).run,
+              stop_fn=lambda: queues["writer"].put(STOP))
+    sup.spawn("detect", run_stream, queues["detect"], db, 3600,
+              stop_fn=lambda: queues["detect"].put(STOP))
+
+    received = listener.PACKETS_RECEIVED.value
+    out = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    msgs = [f"Connection attempt port {p}" for p in range(100, 115)] + ["Failed password for admin"] * 5
+    for m in msgs:
+        out.sendto(m.encode(), sock.getsockname())
+    out.close()
+    deadline = time.monotonic() + 5
+    while listener.PACKETS_RECEIVED.value < received + len(msgs) and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    sup.shutdown()      # detection interval is 1h: alerts only appear from the final drain pass
+    sock.close()
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0] == len(msgs)
+    types = sorted(r[0] for r in conn.execute("SELECT type FROM alerts"))
+    conn.close()
+    assert types == ["FAILED_LOGIN_BURST", "PORT_SCAN"]
+
+def test_listener_startup_does_not_import_flask():
+    code = ("import sys, Capstone.nmas, Capstone.ingest.syslog_listener, Capstone.ingest.writer, "
+            "Capstone.detect.stream; print('flask' in sys.modules)")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+class FlakyConn:
+    """sqlite3 connection whose first `failures` inserts report a locked database."""
+    def __init__(self, conn, failures):
+        self.conn, self.failures = conn, failures
+    def executemany(self, sql, rows):
+        if self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        return self.conn.executemany(sql, rows)
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+def test_writer_retries_locked_batch(tmp_path):
+    conn = make_db(tmp_path / "events.db")
+    rows = [("2025-01-01T00:00:00", "1.2.3.4", "m", None, None)] * 3
+    writer = BatchWriter(queue.Queue(), db_path=tmp_path / "events.db", retry_backoff=0.01)
+    writer.write(FlakyConn(conn, 2), rows)
+    assert conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0] == 3
+    writer.max_retries = 1
+    writer.write(FlakyConn(conn, 2), rows)     # still locked after the last retry: dropped
+    assert conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0] == 3
+    conn.close()
+
+def test_stream_survives_failed_pass(tmp_path):
+    from Capstone.detect import run_detection as rd
+    make_db(tmp_path / "events.db").close()
+
+    class Flaky(StreamingDetector):
+        calls = 0
+        def evaluate(self, now):
+            Flaky.calls += 1
+            if Flaky.calls == 1: raise sqlite3.OperationalError("database is locked")
+            return super().evaluate(now)
+
+    q = queue.Queue()
+    now = datetime.utcnow().replace(microsecond=0).isoformat()
+    for p in range(20):
+        q.put((now, "5.6.7.8", f"port {p}", None, str(p)))
+    failures = rd.PASS_FAILURES.value
+    t = threading.Thread(target=run_stream, args=(q, tmp_path / "events.db", 0.05, Flaky()))
+    t.start()
+    deadline = time.monotonic() + 5
+    while Flaky.calls < 2 and time.monotonic() < deadline:   # first pass fails, the next one runs
+        time.sleep(0.01)
+    q.put(STOP)
+    t.join(5)
+    assert not t.is_alive()
+    conn = sqlite3.connect(tmp_path / "events.db")
+    assert {r[0] for r in conn.execute("SELECT type FROM alerts")} == {"PORT_SCAN"}
+    conn.close()
+    assert rd.PASS_FAILURES.value == failures + 1
@@ -0,0 +1,246 @@
+#test_sketches.py
+# ---------------------------------------------------------------------------
+# Network Monitoring & Alert System (NMAS)
+# Capstone Project – Liberty University
+#
+# Copyright (c) 2025 Simon Peter Hemingway. All rights reserved.
+#
+# This code was developed as part of an academic course at Liberty University.
+# It is provided for educational purposes only. Unauthorized use,
+# reproduction, or distribution of this code without express written
+# permission is prohibited.
+# ---------------------------------------------------------------------------
+
+import random, sqlite3
+import pytest
+from datetime import datetime, timedelta
+from Capstone.detect.run_detection import ensure_alerts
+from Capstone.detect.sketches import HyperLogLog, CountMinSketch, SpaceSaving, HeavyHitters, DEFAULTS
+from Capstone.detect.stream import StreamingDetector
+
+NOW = datetime.utcnow().replace(microsecond=0)
+iso = lambda dt: dt.isoformat(timespec="seconds")
+
+def make_logs(path, seed=7):
+    """Distributed scan: 300 sources probing 3..1000 ports each, plus a Zipf-ish
+    spray of failed logins against 500 usernames from 2000 sources."""
+    rnd = random.Random(seed)
+    rows = []
+    for s in range(300):
+        src = f"198.51.{s // 250}.{s % 250}"
+        for _ in range(rnd.choice((3, 8, 11, 40, 400, 1000))):
+            rows.append((iso(NOW - timedelta(seconds=rnd.randrange(50))), src,
+                         "scan", None, str(rnd.randrange(1, 65536))))
+    for _ in range(30000):
+        user = f"user{int(rnd.paretovariate(1.2)) % 500}"
+        i = int(rnd.paretovariate(1.1)) % 2000
+        src = f"203.0.{i // 250}.{i % 250}"
+        rows.append((iso(NOW - timedelta(seconds=rnd.randrange(3600))), src,
+                     f"Failed password for {user}", user, None))
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE logs (id INTEGER PRIMARY KEY, timestamp TEXT, source TEXT, "
+                 "message TEXT, username TEXT, port TEXT)")
+    ensure_alerts(conn)
+    conn.executemany("INSERT INTO logs (timestamp, source, message, username, port) VALUES (?,?,?,?,?)", rows)
+    conn.commit()
+    conn.close()
+    return rows
+
+@pytest.fixture(scope="module")
+def logs(tmp_path_factory):
+    path = tmp_path_factory.mktemp("sketches") / "events.db"
+    return path, make_logs(path)
+
+def test_hll_distinct_ports_vs_sql(logs):
+    path, rows = logs
+    conn = sqlite3.connect(path)
+    exact = dict(conn.execute("SELECT source, COUNT(DISTINCT port) FROM logs "
+                              "WHERE port IS NOT NULL GROUP BY source"))
+    sketches = {}
+    for _, src, _, _, port in rows:
+        if port is not None:
+            sketches.setdefault(src, HyperLogLog(0.02)).add(port)
+    for src, n in exact.items():
+        est = sketches[src].count()
+        assert abs(est - n) <= max(1, 4 * sketches[src].error * n), (src, n, est)
+    conn.close()
+
+def test_hll_merge_equals_union():
+    a, b, both = HyperLogLog(0.05), HyperLogLog(0.05), HyperLogLog(0.05)
+    for i in range(3000):
+        (a if i % 2 else b).add(i)
+        both.add(i)
+    assert a.merge(b).count() == both.count()
+
+def test_streaming_detector_hll_matches_exact(logs):
+    rows = logs[1]
+    exact, approx = StreamingDetector(), StreamingDetector(hll_error=0.02)
+    for ev in rows:
+        exact.observe(*ev)
+        approx.observe(*ev)
+    assert ({a["source"] for a in exact.evaluate(NOW) if a["type"] == "PORT_SCAN"} ==
+            {a["source"] for a in approx.evaluate(NOW) if a["type"] == "PORT_SCAN"})
+
+def test_count_min_and_heavy_hitters_vs_sql(logs):
+    path, rows = logs
+    conn = sqlite3.connect(path)
+    k = DEFAULTS["top_k"]
+    exact_users = conn.execute("SELECT username, COUNT(*) n FROM logs WHERE username IS NOT NULL "
+                               "GROUP BY username ORDER BY n DESC").fetchall()
+    exact_sources = conn.execute("SELECT source, COUNT(*) n FROM logs "
+                                 "GROUP BY source ORDER BY n DESC").fetchall()
+    conn.close()
+
+    cms = CountMinSketch(epsilon=0.001, delta=0.01)
+    hh, ss = HeavyHitters(k, 0.001, 0.01), SpaceSaving(k)
+    for _, src, _, user, _ in rows:
+        ss.add(src)
+        if user is not None:
+            cms.add(user)
+            hh.add(user)
+    bound = 0.001 * cms.total
+    for user, n in exact_users:
+        assert n <= cms.estimate(user) <= n + bound
+
+    # the clear heavy hitters are found with counts inside the reported bounds
+    truth = dict(exact_users)
+    top_users = hh.top()
+    assert [u for u, _, _ in top_users[:3]] == [u for u, _ in exact_users[:3]]
+    for user, est, err in top_users:
+        assert truth[user] <= est <= truth[user] + err
+
+    truth = dict(exact_sources)
+    top_sources = ss.top()
+    assert top_sources[0][0] == exact_sources[0][0]
+    for src, cnt, err in top_sources:
+        assert cnt - err <= truth.get(src, 0) <= cnt
+
+def test_top_sources_panel(logs, dashboard_client):
+    from Capstone.dashboard import app as dashboard
+    conn = sqlite3.connect(logs[0])
+    since = iso(NOW - timedelta(hours=24))
+    exact = dashboard.top_sources(conn, since, {**DEFAULTS, "enabled": False})
+    approx = dashboard.top_sources(conn, since, {**DEFAULTS, "enabled": True})
+    conn.close()
+    assert not exact["approximate"] and approx["approximate"]
+    assert exact["users"][0][0] == approx["users"][0][0]
+    assert exact["sources"][0][0] == approx["sources"][0][0]
+
+    body = dashboard_client(logs[0]).get("/").get_data(as_text=True)
+    assert "Top sources" in body and exact["sources"][0][0] in body
+
+def test_detection_pass_without_config(tmp_path, monkeypatch):
+    # no config.json: no notifications, alerts still written
+    from Capstone.detect import run_detection as rd
+    db = tmp_path / "events.db"
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE logs (id INTEGER PRIMARY KEY, timestamp TEXT, source TEXT, "
+                 "message TEXT, username TEXT, port TEXT)")
+    ensure_alerts(conn)
+    ts = iso(datetime.utcnow())
+    conn.executemany("INSERT INTO logs (timestamp, source, message, port) VALUES (?,?,?,?)",
+                     [(ts, "5.6.7.8", f"port {p}", str(p)) for p in range(100, 115)])
+    conn.commit()
+    monkeypatch.setattr(rd, "DB", str(db))
+    monkeypatch.setattr(rd, "CONFIG_PATH", tmp_path / "missing.json")
+    rd.main()
+    assert conn.execute("SELECT source FROM alerts WHERE type = 'PORT_SCAN'").fetchall() == [("5.6.7.8",)]
+    conn.close()
+
+def test_merged_summaries_keep_bounds(logs):
+    rows = logs[1]
+    k = DEFAULTS["top_k"]
+    halves = [(SpaceSaving(k), HeavyHitters(k)), (SpaceSaving(k), HeavyHitters(k))]
+    truth_src, truth_user = {}, {}
+    for i, (_, src, _, user, _) in enumerate(rows):
+        ss, hh = halves[i % 2]
+        ss.add(src)
+        truth_src[src] = truth_src.get(src, 0) + 1
+        if user is not None:
+            hh.add(user)
+            truth_user[user] = truth_user.get(user, 0) + 1
+    ss = halves[0][0].merge(halves[1][0])
+    hh = halves[0][1].merge(halves[1][1])
+    assert hh.cms.total == sum(truth_user.values())
+    for src, cnt, err in ss.top():
+        assert cnt - err <= truth_src[src] <= cnt
+    for user, est, err in hh.top():
+        assert truth_user[user] <= est <= truth_user[user] + err
+    assert hh.top(1)[0][0] == max(truth_user, key=truth_user.get)
+
+@pytest.mark.parametrize("enabled", [False, True])
+def test_top_sources_reads_only_new_rows(tmp_path, enabled):
+    from Capstone.dashboard import app as dashboard
+    db = tmp_path / "events.db"
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE logs (id INTEGER PRIMARY KEY, timestamp TEXT, source TEXT, "
+                 "message TEXT, username TEXT, port TEXT)")
+    add = lambda ts, src, n: conn.executemany(
+        "INSERT INTO logs (timestamp, source, message, username) VALUES (?,?,?,?)",
+        [(iso(ts), src, "Failed password", "root")] * n)
+    hour = NOW.replace(minute=0, second=0) - timedelta(hours=3)
+    add(hour + timedelta(minutes=10), "10.0.0.1", 5)    # before `since`, same hour
+    add(hour + timedelta(minutes=40), "10.0.0.2", 3)
+    add(hour + timedelta(hours=1), "10.0.0.3", 4)
+    conn.commit()
+    since = iso(hour + timedelta(minutes=30))
+    sk = {**DEFAULTS, "enabled": enabled}
+
+    first = dashboard.top_sources(conn, since, sk)
+    add(hour + timedelta(hours=2), "10.0.0.3", 2)
+    conn.commit()
+    queries = []
+    conn.set_trace_callback(queries.append)
+    second = dashboard.top_sources(conn, since, sk)
+    conn.close()
+
+    # the refresh reads rows by id, never the whole window
+    assert any("WHERE id > " in q for q in queries)
+    assert not any("WHERE timestamp >= " in q and "AND id <= " in q for q in queries)
+    assert dict((s, n) for s, n, _ in first["sources"])["10.0.0.3"] == 4
+    got = {s: n for s, n, _ in second["sources"]}
+    assert got["10.0.0.3"] == 6 and second["users"][0][0] == "root"
+    if enabled:     # whole first hour counted
+        assert got["10.0.0.1"] == 5 and second["users"][0][1] == 14
+    else:           # exact window
+        assert "10.0.0.1" not in got and second["users"][0][1] == 9
+
+@pytest.mark.parametrize("enabled", [False, True])
+def test_top_sources_wide_window_expires(tmp_path, monkeypatch, enabled):
+    from Capstone.dashboard import app as dashboard
+    conn = sqlite3.connect(tmp_path / "events.db")
+    conn.execute("CREATE TABLE logs (id INTEGER PRIMARY KEY, timestamp TEXT, source TEXT, "
+                 "message TEXT, username TEXT, port TEXT)")
+    now = datetime.utcnow()
+    rnd = random.Random(3)
+    conn.executemany("INSERT INTO logs (timestamp, source, message, username) VALUES (?,?,?,?)",
+                     [(iso(now - timedelta(minutes=rnd.randrange(3 * 24 * 60))), f"10.0.0.{rnd.randrange(20)}",
+                       "Failed password", f"user{int(rnd.paretovariate(1.5)) % 30}") for _ in range(5000)])
+    conn.commit()
+    sk = {**DEFAULTS, "enabled": enabled}
+    since = lambda hours: iso(datetime.utcnow() - timedelta(hours=hours))
+    truth = lambda col, hours: dict(conn.execute(
+        f"SELECT {col}, COUNT(*) FROM logs WHERE timestamp >= ? GROUP BY {col}", (since(hours),)).fetchall())
+
+    def check(hours):
+        got = dashboard.top_sources(conn, since(hours), sk)
+        if enabled:     # Count-Min never under-counts; the whole first hour may be included
+            assert all(truth("username", hours + 1)[u] + err >= n >= truth("username", hours)[u]
+                       for u, n, err in got["users"])
+        else:
+            exact = truth("source", hours)
+            assert all(exact[s] == n for s, n, _ in got["sources"])
+            assert got["sources"][-1][1] >= sorted(exact.values(), reverse=True)[len(got["sources"])]
+            assert got["users"][0][1] == max(truth("username", hours).values())
+        return got
+
+    check(72)
+    tracker = next(t for key, t in dashboard._TOP.items() if key[0] == str(tmp_path / "events.db"))
+    wide = len(tracker.buckets)
+    check(24)           # window from the buckets inside it (fewer than those outside)
+    check(70)           # window from the running total minus the buckets before it
+    assert len(tracker.buckets) == wide
+    monkeypatch.setattr(dashboard, "TOP_SPAN_TTL_SEC", -1)
+    check(24)           # the 72h view has expired: older buckets are dropped
+    assert len(tracker.buckets) <= wide * 25 // 72 + 2
+    conn.close()